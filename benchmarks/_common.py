@@ -0,0 +1,21 @@
+"""Shared setup for the benchmark scripts: puts src/ on the path and points the database at a scratch folder."""
+import os
+import sys
+import tempfile
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+def use_scratch_db():
+    """Redirects database/ to a temp directory so benchmarks never touch data/db. Returns the module."""
+    import database as db
+    tmp = tempfile.mkdtemp(prefix="farm-bench-")
+    db.DB_DIR = tmp
+    db.MEDIA_DIR = os.path.join(tmp, "media")
+    db.SQL_FILE = os.path.join(tmp, "farm.db")
+    db.JSON_USERS = os.path.join(tmp, "users.json")
+    db.JSON_LOGS = os.path.join(tmp, "logs.json")
+    db.shadow.worker.journal_dir = os.path.join(tmp, "shadow")
+    db.configure_pool()
+    db.init_db()
+    return db
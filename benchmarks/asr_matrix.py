@@ -0,0 +1,174 @@
+"""
+Transcription benchmark across model size, precision, threads and workers.
+Reports real-time factor, peak RSS, p50/p95 latency and word error rate per configuration.
+
+    python benchmarks/asr_matrix.py CLIPS_DIR [--models tiny,base] [--compute int8,float32]
+                                    [--threads 2,4] [--workers 1,2] [--batch 8] [--concurrency 8] [--json out.json]
+
+CLIPS_DIR holds voice notes (.ogg/.wav/.mp3/.m4a); a sidecar .txt with the same name is the
+reference transcript used for WER (clips without one are timed but not scored).
+Each configuration runs in its own subprocess so peak RSS isn't inherited from the previous one.
+Clips go through TranscriptionEngine (warm-up, then submit) rather than a bare blocking call, so the
+numbers include the process pool, batching, VAD and splitting that the bot actually uses.
+"""
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import argparse
+import itertools
+import resource
+import subprocess
+
+from _common import SRC_DIR  # noqa: F401 (puts src/ on the path)
+
+AUDIO_EXTENSIONS = (".ogg", ".oga", ".wav", ".mp3", ".m4a")
+
+# --- CLIPS & SCORING ---
+def load_clips(directory):
+    """[(path, reference text or None)] sorted by name."""
+    clips = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(AUDIO_EXTENSIONS):
+            continue
+        path = os.path.join(directory, name)
+        ref_path = os.path.splitext(path)[0] + ".txt"
+        ref = None
+        if os.path.exists(ref_path):
+            with open(ref_path, encoding="utf-8") as f:
+                ref = f.read()
+        clips.append((path, ref))
+    return clips
+
+def _words(text):
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+def word_errors(reference, hypothesis):
+    """(substitutions + deletions + insertions, reference word count), by word-level edit distance."""
+    ref, hyp = _words(reference), _words(hypothesis)
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1], len(ref)
+
+def _pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))] if values else 0.0
+
+# --- ONE CONFIGURATION (runs in a subprocess) ---
+async def _run(config, clips, concurrency):
+    from utils.transcriber.engine import TranscriptionEngine
+    from utils.transcriber.lanes import INTERACTIVE
+
+    # No batching window: latency here should be the engine's, not the wait for company
+    engine = TranscriptionEngine(workers=config["workers"], model_size=config["model"], compute_type=config["compute"],
+                                 cpu_threads=config["threads"], batch_max=config["batch"], batch_window=0)
+    try:
+        start = time.perf_counter()
+        warm = await engine.warm_up()
+        load_s = time.perf_counter() - start
+
+        sem = asyncio.Semaphore(concurrency)
+        async def one(path):
+            async with sem:
+                t0 = time.perf_counter()
+                transcript = await engine.transcribe(path, INTERACTIVE)
+                return transcript, time.perf_counter() - t0
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(one(path) for path, _ in clips))
+        wall_s = time.perf_counter() - start
+    finally:
+        engine.shutdown()
+
+    errors = words = 0
+    for (_, ref), (transcript, _) in zip(clips, results):
+        if ref is not None:
+            e, n = word_errors(ref, transcript.text)
+            errors += e
+            words += n
+    audio_s = sum(t.audio_seconds for t, _ in results)
+    compute_s = sum(t.compute_seconds for t, _ in results)
+    latencies = [lat for _, lat in results]
+    return {
+        **config,
+        "clips": len(clips),
+        "audio_s": round(audio_s, 1),
+        "load_s": round(load_s, 2),
+        "first_clip_s": round(max(first for _, _, first in warm), 3),
+        "rtf": round(compute_s / audio_s, 3) if audio_s else 0,
+        "speed_x": round(audio_s / wall_s, 1) if wall_s else 0,  # Seconds of audio per wall-clock second
+        "p50_s": round(_pct(latencies, 0.50), 2),
+        "p95_s": round(_pct(latencies, 0.95), 2),
+        # ru_maxrss is in KB on Linux; the children are the pool's workers (max over them)
+        "worker_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024),
+        "main_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024),
+        "wer": round(errors / words, 3) if words else None,
+    }
+
+def run_one(config, clips_dir, concurrency):
+    print(json.dumps(asyncio.run(_run(config, load_clips(clips_dir), concurrency))))
+
+# --- MATRIX ---
+def _print_table(rows):
+    cols = ["model", "compute", "threads", "workers", "batch", "load_s", "rtf", "speed_x", "p50_s", "p95_s",
+            "worker_rss_mb", "wer"]
+    widths = {c: max(len(c), *(len(str(r.get(c))) for r in rows)) for c in cols}
+    print("  ".join(c.ljust(widths[c]) for c in cols))
+    for r in rows:
+        print("  ".join(str(r.get(c)).ljust(widths[c]) for c in cols))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("clips_dir")
+    parser.add_argument("--models", default="tiny,base")
+    parser.add_argument("--compute", default="int8,float32")
+    parser.add_argument("--threads", default="2,4")
+    parser.add_argument("--workers", default="1,2")
+    parser.add_argument("--batch", type=int, default=8, help="TRANSCRIBE_BATCH_MAX for every run (1 = no batching)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Clips in flight at once")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)  # Internal: one configuration, as JSON
+    args = parser.parse_args()
+
+    if args.run_one:
+        run_one(json.loads(args.run_one), args.clips_dir, args.concurrency)
+        return
+
+    clips = load_clips(args.clips_dir)
+    if not clips:
+        sys.exit(f"No audio files in {args.clips_dir}")
+    scored = sum(1 for _, ref in clips if ref is not None)
+    print(f"{len(clips)} clips ({scored} with reference transcripts)\n")
+
+    rows = []
+    for model, compute, threads, workers in itertools.product(
+        args.models.split(","), args.compute.split(","),
+        [int(t) for t in args.threads.split(",")], [int(w) for w in args.workers.split(",")],
+    ):
+        config = {"model": model, "compute": compute, "threads": threads, "workers": workers, "batch": args.batch}
+        print(f"▶ {config}", flush=True)
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), args.clips_dir, "--concurrency", str(args.concurrency),
+             "--run-one", json.dumps(config)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"  failed: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else proc.returncode}")
+            continue
+        rows.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    if rows:
+        print()
+        _print_table(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+if __name__ == '__main__':
+    main()
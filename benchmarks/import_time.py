@@ -0,0 +1,76 @@
+"""
+Cold-start import budget. Imports the bot entry point under `python -X importtime`
+and fails (exit 1) if it takes longer than the budget or pulls in a module that
+must stay lazy.
+
+    python benchmarks/import_time.py [--module main] [--budget-ms 1500] [--runs 3]
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+from _common import SRC_DIR
+
+BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+# Loaded on first use only; importing any of these at startup is a regression
+LAZY_MODULES = ("faster_whisper", "ctranslate2", "google.genai", "PIL", "numpy")
+
+def parse_importtime(stderr):
+    """Returns {module: (self_us, cumulative_us)} from -X importtime output."""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+def measure(module):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": SRC_DIR},
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else ""
+        raise RuntimeError(f"import {module} failed: {tail}")
+    return parse_importtime(proc.stderr)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    try:
+        runs = [measure(args.module) for _ in range(args.runs)]
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 2
+    # Best of N: the least noisy estimate of the real cost
+    timings = min(runs, key=lambda t: t[args.module][1])
+    total_ms = timings[args.module][1] / 1000
+
+    print(f"import {args.module}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms, best of {args.runs})")
+    print(f"Slowest {args.top} by self time:")
+    for name, (self_us, _) in sorted(timings.items(), key=lambda kv: -kv[1][0])[:args.top]:
+        print(f"    {self_us / 1000:8.1f} ms  {name}")
+
+    eager = sorted(m for m in timings if m.split(".")[0] in LAZY_MODULES or m in LAZY_MODULES)
+    failed = False
+    if eager:
+        print(f"❌ Imported at startup but should be lazy: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"❌ Cold start over budget by {total_ms - args.budget_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print("✅ Within import budget.")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Construction cost of LogEntry / User / Landmark for N rows: the previous dict-backed
+classes (eager timestamp + weather decoding) vs the current __slots__ ones.
+
+    python benchmarks/row_objects.py [--rows 100000]
+"""
+import gc
+import json
+import time
+import sqlite3
+import argparse
+import tracemalloc
+from datetime import datetime
+
+from _common import SRC_DIR  # noqa: F401  (puts src/ on sys.path)
+import database as db
+
+# --- PREVIOUS IMPLEMENTATION (kept for comparison) ---
+class OldLandmark:
+    def __init__(self, data):
+        self.id = data.get('landmark_id') or data.get('id')
+        self.label = data.get('label', f"Spot {self.id}")
+        self.env = data.get('env', db.ENV_FIELD)
+        self.medium = data.get('medium', db.MED_SOIL)
+
+class OldUser:
+    def __init__(self, data):
+        self.id = data.get('id')
+        self.full_name = data.get('name')
+        self.farm_name = data.get('farm')
+        self.latitude = data.get('lat')
+        self.longitude = data.get('lon')
+        self.photo_time = data.get('p_time')
+        self.voice_time = data.get('v_time')
+        self.landmarks = [OldLandmark(lm) if isinstance(lm, dict) else lm for lm in data.get('landmarks', [])]
+
+class OldLogEntry:
+    def __init__(self, data):
+        self.id = data.get('id')
+        self.user_id = data.get('user_id')
+        self.landmark_id = data.get('landmark_id')
+        self.category = data.get('category', 'adhoc')
+        self.status = data.get('status')
+        self.timestamp = datetime.fromisoformat(data.get('timestamp'))
+        self.files = data.get('files', {})
+        self.transcription = data.get('transcription', "")
+        self.weather = data.get('weather', {})
+        self.landmark_name = data.get('landmark_name') or f"Spot {self.landmark_id}"
+
+def old_entry(row, files):
+    data = dict(row)
+    data['files'] = files
+    data['landmark_name'] = row['landmark_label']
+    data['weather'] = json.loads(row['weather_json']) if row['weather_json'] else {}
+    return OldLogEntry(data)
+
+def new_entry(row, files):
+    return db.LogEntry.from_row(row, files, row['landmark_label'])
+
+# --- FIXTURES ---
+def make_rows(n):
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute("""CREATE TABLE logs (id TEXT, user_id INTEGER, landmark_id INTEGER, category TEXT, status TEXT,
+                    timestamp TEXT, date TEXT, weather_json TEXT, transcription TEXT, landmark_label TEXT)""")
+    weather = json.dumps({"temp": 31.5, "humidity": 48, "wind": 3.2, "desc": "clear sky", "rain": 0})
+    conn.executemany("INSERT INTO logs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+        (f"log-{i}", i % 500, i % 20 + 1, "morning", "Healthy", f"2025-03-{i % 28 + 1:02d}T07:{i % 60:02d}:00",
+         f"2025-03-{i % 28 + 1:02d}", weather, "leaves look fine", f"Bed {i % 20 + 1}")
+        for i in range(n)))
+    return conn.execute("SELECT * FROM logs").fetchall()
+
+def make_profiles(n):
+    lms = [{"landmark_id": i, "label": f"Bed {i}", "env": db.ENV_POLY, "medium": db.MED_COCO} for i in range(1, 6)]
+    return [{"id": i, "name": "Farmer", "farm": "Farm", "lat": 25.2, "lon": 55.3,
+             "p_time": "07:00", "v_time": "19:00", "landmarks": lms} for i in range(n)]
+
+def measure(build):
+    """Returns (seconds, bytes retained by the built objects). Timed and traced in separate runs."""
+    gc.collect()
+    start = time.perf_counter()
+    objs = build()
+    elapsed = time.perf_counter() - start
+    del objs
+
+    gc.collect()
+    tracemalloc.start()
+    objs = build()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objs
+    return elapsed, retained
+
+def report(label, old, new, n):
+    (t_old, m_old), (t_new, m_new) = old, new
+    print(f"{label}:")
+    print(f"    old: {n / t_old:>10,.0f} rows/s  {m_old / n:6.0f} B/row")
+    print(f"    new: {n / t_new:>10,.0f} rows/s  {m_new / n:6.0f} B/row  ({t_old / t_new:.1f}x faster, {m_old / m_new:.1f}x smaller)")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    n = args.rows
+
+    rows = make_rows(n)
+    files = {"photo": "data/media/1/p.jpg"}
+    report("LogEntry", measure(lambda: [old_entry(r, files) for r in rows]),
+           measure(lambda: [new_entry(r, files) for r in rows]), n)
+
+    profiles = make_profiles(n)
+    report("User + 5 Landmarks", measure(lambda: [OldUser(p) for p in profiles]),
+           measure(lambda: [db.User(p) for p in profiles]), n)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Transcription throughput for a burst of short voice notes: one model call per clip vs batched passes.
+
+    python benchmarks/transcribe_batching.py [--clips 32] [--batch 8] [--workers 1] [note.ogg ...]
+
+Pass a few real voice notes for meaningful numbers (they are repeated to fill --clips);
+without files a synthetic 8s tone is used, which only measures the decoding overhead.
+"""
+import os
+import math
+import time
+import wave
+import struct
+import asyncio
+import argparse
+import tempfile
+
+from _common import SRC_DIR  # noqa: F401 (puts src/ on the path)
+from utils.transcriber.engine import TranscriptionEngine
+from utils.transcriber.lanes import BACKGROUND
+
+def _synthetic_clip(seconds=8, rate=16000):
+    path = os.path.join(tempfile.mkdtemp(prefix="farm-bench-"), "tone.wav")
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"".join(
+            struct.pack("<h", int(8000 * math.sin(2 * math.pi * (220 + 40 * (i // rate)) * i / rate)))
+            for i in range(seconds * rate)
+        ))
+    return path
+
+async def _burst(engine, paths):
+    # Warm the pool first so model loading isn't part of the measurement
+    await engine.transcribe(paths[0])
+    start = time.perf_counter()
+    # One farmer's burst: all notes arrive together, as the job runner claims them
+    await asyncio.gather(*(engine.transcribe(p, BACKGROUND, 1) for p in paths))
+    return time.perf_counter() - start
+
+def bench(paths, workers, batch_max):
+    engine = TranscriptionEngine(workers=workers, batch_max=batch_max)
+    try:
+        return asyncio.run(_burst(engine, paths)), engine.stats()
+    finally:
+        engine.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--clips", type=int, default=32)
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    sources = args.files or [_synthetic_clip()]
+    paths = [sources[i % len(sources)] for i in range(args.clips)]
+
+    single, _ = bench(paths, args.workers, 1)
+    batched, stats = bench(paths, args.workers, args.batch)
+
+    print(f"One call per clip: {args.clips / single:6.2f} clips/s")
+    print(f"Batched (max {args.batch}):  {args.clips / batched:6.2f} clips/s  (avg batch {stats['avg_batch']})")
+    print(f"Speed-up:          {single / batched:6.2f}x")
+    print(f"Real-time factor:  {stats['rtf']} ({stats['speech_s']}s of {stats['audio_s']}s audio left after VAD)")
+
+if __name__ == '__main__':
+    main()
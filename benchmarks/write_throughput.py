@@ -0,0 +1,56 @@
+"""
+Sustained insert throughput: one transaction per create_entry() vs the group-commit queue.
+
+    python benchmarks/write_throughput.py [--writes 2000] [--concurrency 200]
+"""
+import time
+import asyncio
+import argparse
+
+from _common import use_scratch_db
+
+def _commit_alone(db, *args):
+    """The pre-queue path: every write in its own transaction."""
+    op, on_commit = db._op_create_entry(*args)
+    with db.get_pool().writer() as conn:
+        result = op(conn)
+    on_commit()
+    return result
+
+async def _drive(write, n, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+    async def one(i):
+        async with sem:
+            return await write(1, i % 20 + 1, {"photo": f"p{i}.jpg"}, "Done", {"temp": 30}, 'morning')
+    start = time.perf_counter()
+    ids = await asyncio.gather(*(one(i) for i in range(n)))
+    elapsed = time.perf_counter() - start
+    assert len(set(ids)) == n
+    return elapsed
+
+async def bench_per_call(db, n, concurrency):
+    return await _drive(lambda *a: db.aio._executor.run(_commit_alone, db, *a), n, concurrency)
+
+async def bench_group_commit(db, n, concurrency):
+    return await _drive(db.aio.create_entry, n, concurrency)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    db = use_scratch_db()
+    db.configure_pool(synchronous="FULL")  # Pay a real fsync per commit, like a power-safe deployment
+    per_call = asyncio.run(bench_per_call(db, args.writes, args.concurrency))
+    grouped = asyncio.run(bench_group_commit(db, args.writes, args.concurrency))
+    stats = db.writes.stats()
+
+    print(f"Per-call commits: {args.writes / per_call:8.0f} writes/s")
+    print(f"Group commit:     {args.writes / grouped:8.0f} writes/s  (avg batch {stats['avg_batch']})")
+    print(f"Speed-up:         {per_call / grouped:8.1f}x")
+    db.writes.shutdown()
+    db.shadow.worker.stop()
+
+if __name__ == '__main__':
+    main()
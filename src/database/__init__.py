@@ -0,0 +1,606 @@
+import sqlite3
+import json
+import os
+import uuid
+import threading
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DB_DIR = os.path.join(BASE_DIR, "data", "db")
+MEDIA_DIR = os.path.join(BASE_DIR, "data", "media")
+SQL_FILE = os.path.join(DB_DIR, "farm.db")
+JSON_USERS = os.path.join(DB_DIR, "users.json")
+JSON_LOGS = os.path.join(DB_DIR, "logs.json")
+
+logger = logging.getLogger(__name__)
+
+# --- CONSTANTS ---
+ENV_FIELD = "Open Field"
+ENV_POLY = "Polyhouse"
+ENV_CEA = "Controlled Env (CEA)"
+
+MED_SOIL = "Soil"
+MED_COCO = "Cocopeat"
+MED_MIX = "Soil + Cocopeat"
+MED_HYDRO = "Hydroponic"
+MED_OTHER = "Other"
+
+# --- DATA CLASSES ---
+# __slots__ keep per-row objects small when a month of history is loaded
+class Landmark:
+    __slots__ = ("id", "label", "env", "medium")
+
+    def __init__(self, data):
+        # We now use 'landmark_id' (1-20) instead of global DB 'id'
+        self.id = data.get('landmark_id') or data.get('id')
+        self.label = data.get('label', f"Spot {self.id}")
+        self.env = data.get('env', ENV_FIELD)
+        self.medium = data.get('medium', MED_SOIL)
+
+    def to_dict(self):
+        return {
+            "id": self.id, "label": self.label,
+            "env": self.env, "medium": self.medium
+        }
+
+class User:
+    __slots__ = ("id", "full_name", "farm_name", "latitude", "longitude", "photo_time", "voice_time", "landmarks")
+
+    def __init__(self, data):
+        self.id = data.get('id')
+        self.full_name = data.get('name')
+        self.farm_name = data.get('farm')
+        self.latitude = data.get('lat')
+        self.longitude = data.get('lon')
+        self.photo_time = data.get('p_time')
+        self.voice_time = data.get('v_time')
+        lm_data = data.get('landmarks', [])
+        self.landmarks = [Landmark(lm) if isinstance(lm, dict) else lm for lm in lm_data]
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.full_name,
+            "farm": self.farm_name,
+            "lat": self.latitude,
+            "lon": self.longitude,
+            "p_time": self.photo_time,
+            "v_time": self.voice_time,
+            "landmarks": [lm.to_dict() for lm in self.landmarks]
+        }
+
+    @property
+    def location(self):
+        """(lat, lon), or None before the farm's location is set."""
+        if self.latitude is None or self.longitude is None:
+            return None
+        return self.latitude, self.longitude
+
+class LogEntry:
+    """
+    timestamp and weather are decoded on first access: rows keep the raw
+    ISO string / weather_json until a handler actually reads them.
+    """
+    __slots__ = ("id", "user_id", "landmark_id", "category", "status", "files", "transcription",
+                 "landmark_name", "_timestamp_raw", "_timestamp", "_weather_raw", "_weather")
+
+    def __init__(self, data):
+        self.id = data.get('id')
+        self.user_id = data.get('user_id')
+        self.landmark_id = data.get('landmark_id')
+        self.category = data.get('category', 'adhoc') 
+        self.status = data.get('status')
+        self._timestamp_raw = data.get('timestamp')
+        self._timestamp = None
+        self.files = data.get('files', {})
+        self.transcription = data.get('transcription', "")
+        # Accepts an already decoded 'weather' dict or the raw 'weather_json' column
+        self._weather = data.get('weather')
+        self._weather_raw = data.get('weather_json')
+        self.landmark_name = self._display_name(data.get('landmark_name'))
+
+    @classmethod
+    def from_row(cls, row, files, landmark_name=None):
+        """Builds an entry straight from a logs row, without an intermediate dict."""
+        self = cls.__new__(cls)
+        self.id = row['id']
+        self.user_id = row['user_id']
+        self.landmark_id = row['landmark_id']
+        self.category = row['category']
+        self.status = row['status']
+        self._timestamp_raw = row['timestamp']
+        self._timestamp = None
+        self.files = files
+        self.transcription = row['transcription']
+        self._weather = None
+        self._weather_raw = row['weather_json']
+        self.landmark_name = self._display_name(landmark_name)
+        return self
+
+    def _display_name(self, name):
+        # Smart Name Logic
+        if name and name not in ["General/Evening", "None"]:
+            return name
+        if self.category == 'evening' or self.landmark_id == 0: 
+            return "Evening Summary"
+        elif self.landmark_id == 99: 
+            return "General Observation"
+        return f"Spot {self.landmark_id}"
+
+    @property
+    def timestamp(self):
+        if self._timestamp is None:
+            self._timestamp = datetime.fromisoformat(self._timestamp_raw)
+        return self._timestamp
+
+    @property
+    def weather(self):
+        if self._weather is None:
+            self._weather = json.loads(self._weather_raw) if self._weather_raw else {}
+        return self._weather
+
+# --- DATABASE CORE ---
+# Tunable per-connection pragmas. cache_size is in KiB when negative.
+DB_PRAGMAS = {
+    "cache_size": int(os.getenv("DB_CACHE_SIZE", "-16000")),
+    "mmap_size": int(os.getenv("DB_MMAP_SIZE", str(64 * 1024 * 1024))),
+    "synchronous": os.getenv("DB_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("DB_BUSY_TIMEOUT", "5000")),
+}
+
+class ConnectionManager:
+    """
+    Keeps long-lived, pre-configured SQLite connections:
+    one shared writer (serialized by a lock) and one reader per thread.
+    """
+    def __init__(self, path, pragmas=None):
+        self.path = path
+        self.pragmas = {**DB_PRAGMAS, **(pragmas or {})}
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        self._writer = None
+        self._write_lock = threading.RLock()
+
+    def _connect(self, readonly=False):
+        # check_same_thread=False: the writer is shared between threads behind _write_lock
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=self.pragmas["busy_timeout"] / 1000)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value};")
+        if readonly:
+            conn.execute("PRAGMA query_only=1;")
+        return conn
+
+    def _get_writer(self):
+        if self._writer is None:
+            self._writer = self._connect()
+            # WAL is persistent in the file, so it only has to be set once
+            self._writer.execute("PRAGMA journal_mode=WAL;")
+        return self._writer
+
+    @contextmanager
+    def reader(self):
+        """Yields this thread's reader connection (opened on first use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Make sure the file exists and is in WAL mode before the first reader opens it
+            with self._write_lock:
+                self._get_writer()
+            conn = self._connect(readonly=True)
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        yield conn
+
+    @contextmanager
+    def writer(self):
+        """Yields the shared writer connection inside a transaction."""
+        with self._write_lock:
+            conn = self._get_writer()
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def close(self):
+        with self._readers_lock:
+            for conn in self._readers:
+                try: conn.close()
+                except Exception: pass
+            self._readers.clear()
+        self._local = threading.local()
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Returns the process-wide ConnectionManager, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionManager(SQL_FILE)
+    return _pool
+
+def configure_pool(**pragmas):
+    """Re-creates the pool with overridden pragmas (e.g. configure_pool(cache_size=-64000))."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = ConnectionManager(SQL_FILE, pragmas)
+    cache.profiles.invalidate()
+    return _pool
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+    cache.profiles.invalidate()
+
+def init_db():
+    """
+    Creates the data folders and brings the schema up to date. Safe to call repeatedly.
+    Importing this package touches nothing on disk; entry points call this explicitly.
+    """
+    os.makedirs(DB_DIR, exist_ok=True)
+    os.makedirs(MEDIA_DIR, exist_ok=True)
+    
+    with get_pool().writer() as conn:
+        applied = migrations.migrate(conn)
+    if applied:
+        cache.profiles.invalidate()
+        logger.info(f"✅ Database migrated to version {applied[-1]}.")
+    
+    # Trigger initial sync
+    if not os.path.exists(JSON_USERS):
+        trigger_sync()
+
+def trigger_sync(users=(), logs=()):
+    """
+    Marks rows for the background shadow worker.
+    Called with no arguments it schedules a full rebuild.
+    """
+    shadow.worker.mark(users=users, logs=logs, full=not (users or logs))
+
+# --- HOT QUERIES ---
+# `python -m database explain` checks these and every other SQL_* constant in the package,
+# and fails if any of them falls back to a full table scan. Keep queries in constants.
+SQL_USER_BY_ID = "SELECT * FROM users WHERE id=?"
+SQL_LANDMARKS_FOR_USER = "SELECT * FROM landmarks WHERE user_id=?"
+# Weather prefetch: farms whose morning alert is in one slot
+SQL_LOCATIONS_FOR_PHOTO_TIME = "SELECT lat, lon FROM users WHERE p_time=? AND lat IS NOT NULL AND lon IS NOT NULL"
+# Routine checks and the date grid read the daily_progress rollup kept by create_entry
+SQL_MORNING_DONE_IDS = "SELECT landmark_id FROM daily_progress WHERE user_id=? AND date=? AND category='morning'"
+SQL_EVENING_DONE = "SELECT 1 FROM daily_progress WHERE user_id=? AND date=? AND category='evening' LIMIT 1"
+SQL_DATE_COUNTS = "SELECT date, SUM(count) as count FROM daily_progress WHERE user_id=? AND date BETWEEN ? AND ? GROUP BY date"
+SQL_BUMP_PROGRESS = """
+    INSERT INTO daily_progress (user_id, date, category, landmark_id, count) VALUES (?, ?, ?, ?, 1)
+    ON CONFLICT(user_id, date, category, landmark_id) DO UPDATE SET count = count + 1
+"""
+# Join on composite key: user_id AND landmark_id
+SQL_ENTRIES_IN_RANGE = """
+    SELECT l.*, lm.label as landmark_label 
+    FROM logs l
+    LEFT JOIN landmarks lm ON l.user_id = lm.user_id AND l.landmark_id = lm.landmark_id
+    WHERE l.user_id=? AND l.date BETWEEN ? AND ?
+    ORDER BY l.date, l.timestamp
+"""
+# Batched lookups: '{}' is filled with one placeholder per id
+SQL_MEDIA_FOR_LOGS = "SELECT log_id, file_type, file_path FROM media WHERE log_id IN ({})"
+SQL_LANDMARKS_FOR_USERS = "SELECT * FROM landmarks WHERE user_id IN ({}) ORDER BY user_id, landmark_id"
+SQL_USERS_BY_IDS = "SELECT * FROM users WHERE id IN ({})"
+SQL_LOGS_BY_IDS = "SELECT * FROM logs WHERE id IN ({})"
+
+HOT_QUERIES = {
+    "user_by_id": SQL_USER_BY_ID,
+    "landmarks_for_user": SQL_LANDMARKS_FOR_USER,
+    "locations_for_photo_time": SQL_LOCATIONS_FOR_PHOTO_TIME,
+    "morning_done_ids": SQL_MORNING_DONE_IDS,
+    "evening_done": SQL_EVENING_DONE,
+    "date_counts": SQL_DATE_COUNTS,
+    "entries_in_range": SQL_ENTRIES_IN_RANGE,
+    "media_for_logs": SQL_MEDIA_FOR_LOGS.format("?, ?"),
+    "landmarks_for_users": SQL_LANDMARKS_FOR_USERS.format("?, ?"),
+}
+
+# Max ids per IN (...) batch; stays well under SQLite's bound-variable limit
+BATCH_SIZE = 500
+
+def _chunks(items, size=BATCH_SIZE):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _placeholders(n):
+    return ", ".join(["?"] * n)
+
+def _date_str(d):
+    return d if isinstance(d, str) else d.strftime("%Y-%m-%d")
+
+# --- BATCHED READS ---
+def _media_for_logs(conn, log_ids):
+    """{log_id: {file_type: file_path}} for many logs in one query per batch."""
+    files = {}
+    for chunk in _chunks(log_ids):
+        rows = conn.execute(SQL_MEDIA_FOR_LOGS.format(_placeholders(len(chunk))), chunk).fetchall()
+        for m in rows:
+            files.setdefault(m['log_id'], {})[m['file_type']] = m['file_path']
+    return files
+
+def _iter_logs_with_media(conn, sql, params):
+    cursor = conn.execute(sql, params)
+    while True:
+        rows = cursor.fetchmany(BATCH_SIZE)
+        if not rows:
+            return
+        media = _media_for_logs(conn, [row['id'] for row in rows])
+        for row in rows:
+            yield row, media.get(row['id'], {})
+
+def fetch_entries(user_id, date_from, date_to):
+    """
+    Yields a user's LogEntry objects between two dates (inclusive, date or 'YYYY-MM-DD'),
+    oldest first. Logs are read in batches and each batch's media comes from a single query.
+    """
+    with get_pool().reader() as conn:
+        params = (user_id, _date_str(date_from), _date_str(date_to))
+        for log, files in _iter_logs_with_media(conn, SQL_ENTRIES_IN_RANGE, params):
+            yield LogEntry.from_row(log, files, log['landmark_label'])
+
+def iter_logs(log_ids=None):
+    """Yields (log_row, files) for the given log ids, or for every log newest first."""
+    with get_pool().reader() as conn:
+        if log_ids is None:
+            yield from _iter_logs_with_media(conn, "SELECT * FROM logs ORDER BY timestamp DESC", ())
+            return
+        for chunk in _chunks(log_ids):
+            yield from _iter_logs_with_media(conn, SQL_LOGS_BY_IDS.format(_placeholders(len(chunk))), chunk)
+
+def fetch_users(user_ids=None):
+    """Returns user rows as dicts with their 'landmarks' attached, or every user when user_ids is None."""
+    with get_pool().reader() as conn:
+        if user_ids is None:
+            user_rows = conn.execute("SELECT * FROM users").fetchall()
+        else:
+            user_rows = []
+            for chunk in _chunks(user_ids):
+                user_rows += conn.execute(SQL_USERS_BY_IDS.format(_placeholders(len(chunk))), chunk).fetchall()
+        
+        users = {row['id']: dict(row, landmarks=[]) for row in user_rows}
+        for chunk in _chunks(users.keys()):
+            for lm in conn.execute(SQL_LANDMARKS_FOR_USERS.format(_placeholders(len(chunk))), chunk).fetchall():
+                users[lm['user_id']]['landmarks'].append(dict(lm))
+    return list(users.values())
+
+# --- USER FUNCTIONS ---
+def _load_profile(user_id):
+    with get_pool().reader() as conn:
+        u = conn.execute(SQL_USER_BY_ID, (user_id,)).fetchone()
+        if not u:
+            return None
+        
+        lms = conn.execute(SQL_LANDMARKS_FOR_USER, (user_id,)).fetchall()
+    
+    user_data = dict(u)
+    # Map 'landmark_id' to the '.id' attribute for compatibility
+    user_data['landmarks'] = [dict(l) for l in lms]
+    return user_data
+
+def get_user_profile(user_id):
+    """Served from the profile cache; a fresh User is built each call, so callers may mutate it."""
+    user_data = cache.profiles.get(user_id)
+    if user_data is cache.MISS:
+        version = cache.profiles.version
+        user_data = _load_profile(user_id)
+        cache.profiles.put(user_id, user_data, version)
+    return User(user_data) if user_data else None
+
+def update_user_schedule(user_id, p_time=None, v_time=None):
+    with get_pool().writer() as conn:
+        if p_time:
+            conn.execute("UPDATE users SET p_time=? WHERE id=?", (p_time, user_id))
+        if v_time:
+            conn.execute("UPDATE users SET v_time=? WHERE id=?", (v_time, user_id))
+    cache.profiles.invalidate(user_id)
+    trigger_sync(users=[user_id])
+
+def save_user_profile(user_data):
+    with get_pool().writer() as conn:
+        c = conn.cursor()
+        
+        # 1. Update User Info
+        c.execute("""
+            INSERT OR REPLACE INTO users (id, name, farm, lat, lon, p_time, v_time)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            user_data['id'], user_data['name'], user_data['farm'],
+            user_data['lat'], user_data['lon'],
+            user_data['p_time'], user_data['v_time']
+        ))
+        
+        # 2. Update Landmarks - Now using stable per-user IDs (1-20)
+        # We fetch existing to preserve IDs if not provided
+        existing_lms = c.execute("SELECT landmark_id, label FROM landmarks WHERE user_id=?", (user_data['id'],)).fetchall()
+        lm_map = {row['label']: row['landmark_id'] for row in existing_lms}
+        
+        c.execute("DELETE FROM landmarks WHERE user_id=?", (user_data['id'],))
+        
+        # Find next available ID (excluding reserved 99)
+        current_ids = [row['landmark_id'] for row in existing_lms if row['landmark_id'] != 99]
+        next_id = max(current_ids, default=0) + 1
+        
+        for lm in user_data.get('landmarks', []):
+            if hasattr(lm, 'to_dict'): lm = lm.to_dict()
+            
+            l_id = lm.get('landmark_id') or lm.get('id')
+            
+            # If no ID, try to match by label or assign new
+            if not l_id:
+                l_id = lm_map.get(lm['label'], next_id)
+                if l_id == next_id:
+                    next_id += 1
+            
+            c.execute("""
+                INSERT INTO landmarks (user_id, landmark_id, label, env, medium)
+                VALUES (?, ?, ?, ?, ?)
+            """, (user_data['id'], l_id, lm['label'], lm['env'], lm['medium']))
+        
+    cache.profiles.invalidate(user_data['id'])
+    trigger_sync(users=[user_data['id']])
+
+def get_all_user_ids():
+    """Returns a list of all registered user IDs for job restoration."""
+    try:
+        with get_pool().reader() as conn:
+            rows = conn.execute("SELECT id FROM users").fetchall()
+        return [row['id'] for row in rows]
+    except Exception:
+        return []
+
+def get_locations_for_photo_time(p_time):
+    """(lat, lon) of every farm whose morning alert is at p_time ("HH:MM"), for the weather prefetch."""
+    with get_pool().reader() as conn:
+        rows = conn.execute(SQL_LOCATIONS_FOR_PHOTO_TIME, (p_time,)).fetchall()
+    return [(row['lat'], row['lon']) for row in rows]
+
+def get_user_landmarks(user_id):
+    user = get_user_profile(user_id)
+    return user.landmarks if user else []
+
+def get_landmark_by_id(user_id, landmark_id):
+    user = get_user_profile(user_id)
+    if not user: return None
+    for lm in user.landmarks:
+        if lm.id == int(landmark_id): return lm
+    return None
+
+def get_pending_landmark_ids(user_id):
+    """ Returns list of landmark IDs that have NOT been checked this morning. """
+    today = datetime.now().strftime("%Y-%m-%d")
+    
+    all_ids = set(lm.id for lm in get_user_landmarks(user_id))
+    return sorted(list(all_ids - _morning_done_ids(user_id, today)))
+
+def _morning_done_ids(user_id, date_str):
+    with get_pool().reader() as conn:
+        return set(row['landmark_id'] for row in conn.execute(SQL_MORNING_DONE_IDS, (user_id, date_str)).fetchall())
+
+# --- OTHER DB FUNCTIONS ---
+def get_entries_by_date_range(user_id, start_date, end_date):
+    s_str = start_date.strftime("%Y-%m-%d")
+    e_str = end_date.strftime("%Y-%m-%d")
+    with get_pool().reader() as conn:
+        rows = conn.execute(SQL_DATE_COUNTS, (user_id, s_str, e_str)).fetchall()
+    return {row['date']: row['count'] for row in rows}
+
+def is_routine_done(user_id, routine_type):
+    today = datetime.now().strftime("%Y-%m-%d")
+    if routine_type == 'morning':
+        # Get user's current landmarks
+        current_ids = [lm.id for lm in get_user_landmarks(user_id)]
+        
+        if not current_ids: return False
+        
+        # Every one of THESE SPECIFIC IDs (1-20) needs a morning log today
+        done_ids = _morning_done_ids(user_id, today)
+        return all(lm_id in done_ids for lm_id in current_ids)
+        
+    elif routine_type == 'evening':
+        with get_pool().reader() as conn:
+            return conn.execute(SQL_EVENING_DONE, (user_id, today)).fetchone() is not None
+    return False
+
+# --- WRITE OPS ---
+# Each builder returns (op, on_commit) for the group-commit queue in database.writes.
+# op(conn) runs inside the batch transaction; on_commit() runs once it is durable.
+def _op_create_entry(user_id, landmark_id, file_paths, status, weather, category='adhoc', transcription="", transcribe=(),
+                     weather_at=None):
+    entry_id = str(uuid.uuid4())
+    timestamp = datetime.now().isoformat()
+    date_str = datetime.now().strftime("%Y-%m-%d")
+    if weather_at is not None:
+        weather = enrichment.PENDING
+    weather_json = json.dumps(weather)
+    media = [(entry_id, path, key) for key, path in file_paths.items()]
+
+    def op(conn):
+        conn.execute("""
+            INSERT INTO logs (id, user_id, landmark_id, category, status, timestamp, date, weather_json, transcription)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (entry_id, user_id, landmark_id, category, status, timestamp, date_str, weather_json, transcription))
+        if media:
+            conn.executemany("INSERT INTO media (log_id, file_path, file_type) VALUES (?, ?, ?)", media)
+        conn.execute(SQL_BUMP_PROGRESS, (user_id, date_str, category, landmark_id))
+        if transcribe:
+            jobs.enqueue(conn, entry_id, user_id, transcribe)
+        if weather_at is not None:
+            enrichment.enqueue(conn, entry_id, *weather_at)
+        return entry_id
+    return op, lambda: trigger_sync(logs=[entry_id])
+
+def _op_update_transcription(entry_id, text):
+    def op(conn):
+        conn.execute("UPDATE logs SET transcription = ? WHERE id = ?", (text, entry_id))
+    return op, lambda: trigger_sync(logs=[entry_id])
+
+def _op_log_ai_interaction(user_id, prompt, response, model_used, log_id=None):
+    timestamp = datetime.now().isoformat()
+    def op(conn):
+        cursor = conn.execute("INSERT INTO ai_interactions (user_id, log_id, prompt, response, model_used, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+                              (user_id, log_id, prompt, response, model_used, timestamp))
+        return cursor.lastrowid
+    return op, None
+
+def _op_update_ai_feedback(interaction_id, status, note=None):
+    def op(conn):
+        if note is not None:
+            conn.execute("UPDATE ai_interactions SET feedback_status=?, feedback_note=? WHERE id=?", (status, note, interaction_id))
+        else:
+            conn.execute("UPDATE ai_interactions SET feedback_status=? WHERE id=?", (status, interaction_id))
+    return op, None
+
+# Blocking wrappers: return once the write is committed
+def create_entry(user_id, landmark_id, file_paths, status, weather, category='adhoc', transcription="", transcribe=(),
+                 weather_at=None):
+    """
+    transcribe: voice file paths to queue as durable transcription jobs for this entry.
+    weather_at: (lat, lon) to fetch the weather for in the background; the entry is saved as pending meanwhile.
+    """
+    return writes.execute(*_op_create_entry(user_id, landmark_id, file_paths, status, weather, category, transcription,
+                                            transcribe, weather_at))
+
+def update_transcription(entry_id, text):
+    writes.execute(*_op_update_transcription(entry_id, text))
+
+def log_ai_interaction(user_id, prompt, response, model_used, log_id=None):
+    return writes.execute(*_op_log_ai_interaction(user_id, prompt, response, model_used, log_id))
+
+def update_ai_feedback(interaction_id, status, note=None):
+    writes.execute(*_op_update_ai_feedback(interaction_id, status, note))
+
+def get_entries_for_date(user_id, date_str):
+    return list(fetch_entries(user_id, date_str, date_str))
+
+# Submodules (imported last: they build on the functions defined above)
+from database import cache
+from database import migrations
+from database import shadow
+from database import writes
+from database import jobs
+from database import transcripts
+from database import weather_cache
+from database import enrichment
+from database import aio
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""
+Admin commands, run from src/:
+    python -m database migrate    # apply pending schema migrations
+    python -m database explain    # print every query's plan, exit 1 on a full table scan
+    python -m database backfill-progress [--user ID]   # rebuild daily_progress from logs
+"""
+import sys
+import argparse
+
+import database as db
+from database import migrations
+
+def cmd_migrate(args):
+    db.init_db()
+    with db.get_pool().reader() as conn:
+        print(f"Schema version: {migrations.get_version(conn)} (latest {migrations.LATEST_VERSION})")
+    return 0
+
+def cmd_explain(args):
+    db.init_db()
+    with db.get_pool().reader() as conn:
+        plans = migrations.explain_hot_queries(conn)
+    for name, details in plans.items():
+        print(f"{name}:")
+        for d in details:
+            print(f"    {d}")
+    offenders = migrations.find_full_scans(plans)
+    if offenders:
+        print(f"❌ Full table scan in: {', '.join(offenders)}")
+        return 1
+    print("✅ All queries use an index.")
+    return 0
+
+def cmd_backfill_progress(args):
+    db.init_db()
+    with db.get_pool().writer() as conn:
+        rows = migrations.backfill_daily_progress(conn, args.user)
+    print(f"✅ daily_progress rebuilt: {rows} rows.")
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m database")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("migrate", help="Apply pending schema migrations").set_defaults(func=cmd_migrate)
+    sub.add_parser("explain", help="Check every query for full table scans").set_defaults(func=cmd_explain)
+    backfill = sub.add_parser("backfill-progress", help="Rebuild the daily_progress rollup from logs")
+    backfill.add_argument("--user", type=int, help="Only this user ID")
+    backfill.set_defaults(func=cmd_backfill_progress)
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import os
+import queue
+import asyncio
+import logging
+import threading
+import functools
+from concurrent.futures import Future
+
+import database as db
+from database import writes
+from database import jobs
+from database import transcripts
+from database import weather_cache
+from database import enrichment
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+QUEUE_SIZE = int(os.getenv("DB_QUEUE_SIZE", "256"))  # Pending calls before callers back off
+
+# --- EXECUTOR ---
+class DBExecutor:
+    """
+    Runs database calls on one dedicated thread fed by a bounded queue,
+    so the bot's event loop never waits on SQLite or disk fsyncs.
+    """
+    def __init__(self, maxsize=QUEUE_SIZE, name="db-executor"):
+        self.name = name
+        self._queue = queue.Queue(maxsize)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            fn, args, kwargs, fut = item
+            if not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                fut.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                fut.set_exception(e)
+
+    def submit(self, fn, *args, **kwargs):
+        """Queues a call from any thread; blocks only if the queue is full."""
+        self._ensure_started()
+        fut = Future()
+        self._queue.put((fn, args, kwargs, fut))
+        return fut
+
+    async def run(self, fn, *args, **kwargs):
+        """Awaitable version of submit(). Backs off to a helper thread when the queue is full."""
+        self._ensure_started()
+        fut = Future()
+        item = (fn, args, kwargs, fut)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            logger.debug("DB queue full, caller is waiting for a slot.")
+            await asyncio.to_thread(self._queue.put, item)
+        return await asyncio.wrap_future(fut)
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def shutdown(self, wait=True):
+        """Lets queued calls finish, then stops the thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        if wait:
+            self._thread.join()
+        self._thread = None
+
+_executor = DBExecutor()
+
+def shutdown(wait=True):
+    _executor.shutdown(wait)
+
+def queue_depth():
+    return _executor.queue_depth
+
+def _async(fn):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await _executor.run(fn, *args, **kwargs)
+    return wrapper
+
+def _async_profile(fn):
+    """Profile reads: answered on the event loop when the user is cached, otherwise on the DB thread."""
+    @functools.wraps(fn)
+    async def wrapper(user_id, *args, **kwargs):
+        if user_id in db.cache.profiles:
+            return fn(user_id, *args, **kwargs)
+        return await _executor.run(fn, user_id, *args, **kwargs)
+    return wrapper
+
+def _async_write(build):
+    """Sends a write straight to the group-commit queue, so concurrent callers share a transaction."""
+    async def wrapper(*args, **kwargs):
+        return await writes.run(*build(*args, **kwargs))
+    return wrapper
+
+# --- AWAITABLE API ---
+get_user_profile = _async_profile(db.get_user_profile)
+update_user_schedule = _async(db.update_user_schedule)
+save_user_profile = _async(db.save_user_profile)
+get_all_user_ids = _async(db.get_all_user_ids)
+get_locations_for_photo_time = _async(db.get_locations_for_photo_time)
+get_user_landmarks = _async_profile(db.get_user_landmarks)
+get_landmark_by_id = _async_profile(db.get_landmark_by_id)
+get_pending_landmark_ids = _async(db.get_pending_landmark_ids)
+get_entries_by_date_range = _async(db.get_entries_by_date_range)
+is_routine_done = _async(db.is_routine_done)
+create_entry = _async_write(db._op_create_entry)
+update_transcription = _async_write(db._op_update_transcription)
+log_ai_interaction = _async_write(db._op_log_ai_interaction)
+update_ai_feedback = _async_write(db._op_update_ai_feedback)
+get_entries_for_date = _async(db.get_entries_for_date)
+fetch_users = _async(db.fetch_users)
+
+# Transcription job queue
+claim_jobs = _async_write(jobs._op_claim)
+complete_job = _async_write(jobs._op_complete)
+retry_job = _async_write(jobs._op_retry)
+fail_job = _async_write(jobs._op_fail)
+requeue_orphan_jobs = _async_write(jobs._op_requeue_orphans)
+job_counts = _async(jobs.counts)
+job_realtime_factor = _async(jobs.realtime_factor)
+
+# Transcript cache
+lookup_transcript = _async(transcripts.lookup)
+store_transcript = _async_write(transcripts._op_store)
+transcript_stats = _async(transcripts.stats)
+
+# Weather cache (SQLite tier)
+lookup_weather = _async(weather_cache.lookup)
+store_weather = _async_write(weather_cache._op_store)
+
+# Deferred weather for saved entries
+claim_weather_jobs = _async_write(enrichment._op_claim)
+fill_weather = _async_write(enrichment._op_fill)
+retry_weather = _async_write(enrichment._op_retry)
+defer_weather = _async_write(enrichment._op_defer)
+give_up_weather = _async_write(enrichment._op_give_up)
+pending_weather = _async(enrichment.pending)
+
+async def fetch_entries(user_id, date_from, date_to):
+    """Awaitable version of database.fetch_entries(), materialized as a list."""
+    return await _executor.run(lambda: list(db.fetch_entries(user_id, date_from, date_to)))
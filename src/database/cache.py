@@ -0,0 +1,73 @@
+import os
+import threading
+from collections import OrderedDict
+
+# --- CONFIGURATION ---
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "1024"))  # Users kept in memory
+
+MISS = object()
+
+# --- PROFILE CACHE ---
+class ProfileCache:
+    """
+    Bounded LRU of raw profile rows (user row + landmark dicts), keyed by user_id.
+    Unknown users are cached as None so unregistered chatters don't hit SQLite either.
+
+    Every invalidation bumps `version`. A loader captures the version before it
+    queries and put() drops the result if a write happened in between, so a slow
+    read can never re-insert a profile that was just changed.
+    """
+    def __init__(self, maxsize=PROFILE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        """Returns the cached row data (or None for a known non-user), else MISS."""
+        with self._lock:
+            try:
+                data = self._data[user_id]
+            except KeyError:
+                self.misses += 1
+                return MISS
+            self._data.move_to_end(user_id)
+            self.hits += 1
+            return data
+
+    def __contains__(self, user_id):
+        with self._lock:
+            return user_id in self._data
+
+    def put(self, user_id, data, version):
+        with self._lock:
+            if version != self.version:
+                return
+            self._data[user_id] = data
+            self._data.move_to_end(user_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, user_id=None):
+        """Drops one user, or everything when called without an id (migrations, pool swaps)."""
+        with self._lock:
+            self.version += 1
+            if user_id is None:
+                self._data.clear()
+            else:
+                self._data.pop(user_id, None)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0,
+                "version": self.version,
+            }
+
+profiles = ProfileCache()
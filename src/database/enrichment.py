@@ -0,0 +1,73 @@
+import os
+import json
+import logging
+from datetime import datetime, timedelta
+
+import database as db
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+MAX_ATTEMPTS = int(os.getenv("WEATHER_MAX_ATTEMPTS", "5"))
+RETRY_BASE_SECONDS = float(os.getenv("WEATHER_RETRY_BASE", "30"))  # 30s, 60s, 120s, ...
+LEASE_SECONDS = 120  # A claimed job is due again after this, so a crash mid-fetch only delays it
+
+# --- CONSTANTS ---
+PENDING = {"pending": True}  # weather_json of an entry whose reading hasn't arrived yet
+
+SQL_DUE_WEATHER = "SELECT log_id FROM weather_jobs WHERE next_attempt_at<=? ORDER BY next_attempt_at LIMIT ?"
+
+db.HOT_QUERIES["due_weather"] = SQL_DUE_WEATHER
+
+def _now():
+    return datetime.now().isoformat()
+
+# --- ENQUEUE ---
+def enqueue(conn, log_id, lat, lon):
+    """Pending weather lookup for a new entry, at the farm's location when it was saved."""
+    now = _now()
+    conn.execute("""
+        INSERT INTO weather_jobs (log_id, lat, lon, created_at, next_attempt_at) VALUES (?, ?, ?, ?, ?)
+    """, (log_id, lat, lon, now, now))
+
+# --- WRITE OPS ---
+def _op_claim(limit):
+    """Due jobs, leased rather than marked running: if the bot dies they simply come due again."""
+    def op(conn):
+        now = datetime.now()
+        lease = (now + timedelta(seconds=LEASE_SECONDS)).isoformat()
+        rows = conn.execute(f"""
+            UPDATE weather_jobs SET attempts=attempts+1, next_attempt_at=?
+            WHERE log_id IN ({SQL_DUE_WEATHER}) RETURNING *
+        """, (lease, now.isoformat(), limit)).fetchall()
+        return [dict(r) for r in rows]
+    return op, None
+
+def _op_fill(log_id, weather):
+    def op(conn):
+        conn.execute("UPDATE logs SET weather_json=? WHERE id=?", (json.dumps(weather), log_id))
+        conn.execute("DELETE FROM weather_jobs WHERE log_id=?", (log_id,))
+    return op, lambda: db.trigger_sync(logs=[log_id])
+
+def _op_retry(log_id, error, delay):
+    def op(conn):
+        due = (datetime.now() + timedelta(seconds=delay)).isoformat()
+        conn.execute("UPDATE weather_jobs SET error=?, next_attempt_at=? WHERE log_id=?", (error, due, log_id))
+    return op, None
+
+def _op_defer(log_id, error, delay):
+    """Like _op_retry, but hands back the claim's attempt: the call was refused (outage), not tried."""
+    def op(conn):
+        due = (datetime.now() + timedelta(seconds=delay)).isoformat()
+        conn.execute("UPDATE weather_jobs SET attempts=MAX(attempts-1, 0), error=?, next_attempt_at=? WHERE log_id=?",
+                     (error, due, log_id))
+    return op, None
+
+def _op_give_up(log_id):
+    """The entry keeps no weather, as it did when the fetch failed at save time."""
+    return _op_fill(log_id, {})
+
+# --- BLOCKING API ---
+def pending():
+    with db.get_pool().reader() as conn:
+        return conn.execute("SELECT COUNT(*) FROM weather_jobs").fetchone()[0]
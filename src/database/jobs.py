@@ -0,0 +1,149 @@
+import os
+import logging
+from datetime import datetime, timedelta
+
+import database as db
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+MAX_ATTEMPTS = int(os.getenv("TRANSCRIBE_MAX_ATTEMPTS", "3"))
+RETRY_BASE_SECONDS = float(os.getenv("TRANSCRIBE_RETRY_BASE", "30"))  # 30s, 60s, 120s, ...
+
+# --- CONSTANTS ---
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+FAILED_TEXT = "⚠️ Transcription failed."
+PARTIAL_MARK = " ⏳"  # Appended while some of the entry's audio is still being transcribed
+
+# Due jobs, round-robin across users: everyone's oldest job comes before anyone's second
+SQL_DUE_JOBS = """
+    SELECT id FROM (
+        SELECT id, ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY id) AS turn
+        FROM transcription_jobs WHERE state='queued' AND next_attempt_at<=?
+    ) ORDER BY turn, id LIMIT ?
+"""
+SQL_JOBS_FOR_LOG = "SELECT state, text FROM transcription_jobs WHERE log_id=? ORDER BY seq"
+
+db.HOT_QUERIES.update({
+    "due_jobs": SQL_DUE_JOBS,
+    "jobs_for_log": SQL_JOBS_FOR_LOG,
+})
+
+def _now():
+    return datetime.now().isoformat()
+
+# --- ENQUEUE ---
+def enqueue(conn, log_id, user_id, file_paths):
+    """Adds one queued job per file. Called inside create_entry's transaction, so entry and jobs commit together."""
+    now = _now()
+    conn.executemany("""
+        INSERT INTO transcription_jobs (log_id, user_id, file_path, seq, state, created_at, updated_at, next_attempt_at)
+        VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)
+    """, [(log_id, user_id, path, seq, now, now, now) for seq, path in enumerate(file_paths)])
+
+def _refresh_transcription(conn, log_id):
+    """
+    Rebuilds logs.transcription from the entry's jobs, in recording order.
+    Running jobs contribute their partial text (long recordings); the entry keeps
+    the placeholder until some text exists, then shows it marked as in progress.
+    """
+    rows = conn.execute(SQL_JOBS_FOR_LOG, (log_id,)).fetchall()
+    texts = [r['text'] for r in rows if r['state'] in (DONE, RUNNING) and r['text']]
+    pending = any(r['state'] in (QUEUED, RUNNING) for r in rows)
+    if texts:
+        text = " ".join(texts) + (PARTIAL_MARK if pending else "")
+    elif pending:
+        return
+    elif any(r['state'] == FAILED for r in rows):
+        text = FAILED_TEXT
+    else:
+        text = ""  # Only silence
+    conn.execute("UPDATE logs SET transcription = ? WHERE id = ?", (text, log_id))
+
+# --- WRITE OPS ---
+def _op_claim(limit):
+    def op(conn):
+        now = _now()
+        rows = conn.execute(f"""
+            UPDATE transcription_jobs SET state='running', attempts=attempts+1, text=NULL, updated_at=?
+            WHERE id IN ({SQL_DUE_JOBS}) RETURNING *
+        """, (now, now, limit)).fetchall()
+        return sorted((dict(r) for r in rows), key=lambda j: j['id'])
+    return op, None
+
+def _op_complete(job_id, log_id, text, audio_seconds=None, compute_seconds=None):
+    def op(conn):
+        conn.execute("""
+            UPDATE transcription_jobs SET state='done', text=?, error=NULL, updated_at=?, audio_seconds=?, compute_seconds=?
+            WHERE id=?
+        """, (text, _now(), audio_seconds, compute_seconds, job_id))
+        _refresh_transcription(conn, log_id)
+    return op, lambda: db.trigger_sync(logs=[log_id])
+
+def _op_retry(job_id, error, delay):
+    def op(conn):
+        due = (datetime.now() + timedelta(seconds=delay)).isoformat()
+        conn.execute("UPDATE transcription_jobs SET state='queued', text=NULL, error=?, updated_at=?, next_attempt_at=? WHERE id=?",
+                     (error, _now(), due, job_id))
+    return op, None
+
+def _op_partial(job_id, log_id, text):
+    """Text of a long recording's finished leading chunks (ignored once the job is no longer running)."""
+    def op(conn):
+        updated = conn.execute("UPDATE transcription_jobs SET text=?, updated_at=? WHERE id=? AND state='running'",
+                               (text, _now(), job_id)).rowcount
+        if updated:
+            _refresh_transcription(conn, log_id)
+    return op, lambda: db.trigger_sync(logs=[log_id])
+
+def _op_fail(job_id, log_id, error):
+    def op(conn):
+        conn.execute("UPDATE transcription_jobs SET state='failed', error=?, updated_at=? WHERE id=?",
+                     (error, _now(), job_id))
+        _refresh_transcription(conn, log_id)
+    return op, lambda: db.trigger_sync(logs=[log_id])
+
+def _op_requeue_orphans():
+    """Jobs left 'running' by a crash or deploy go back to the queue (the attempt still counts)."""
+    def op(conn):
+        now = _now()
+        return conn.execute("UPDATE transcription_jobs SET state='queued', updated_at=?, next_attempt_at=? WHERE state='running'",
+                            (now, now)).rowcount
+    return op, None
+
+# --- BLOCKING API ---
+def claim(limit):
+    return db.writes.execute(*_op_claim(limit))
+
+def complete(job_id, log_id, text, audio_seconds=None, compute_seconds=None):
+    db.writes.execute(*_op_complete(job_id, log_id, text, audio_seconds, compute_seconds))
+
+def retry(job_id, error, delay):
+    db.writes.execute(*_op_retry(job_id, error, delay))
+
+def fail(job_id, log_id, error):
+    db.writes.execute(*_op_fail(job_id, log_id, error))
+
+def requeue_orphans():
+    return db.writes.execute(*_op_requeue_orphans())
+
+def counts():
+    """{state: number of jobs} for monitoring."""
+    with db.get_pool().reader() as conn:
+        rows = conn.execute("SELECT state, COUNT(*) FROM transcription_jobs GROUP BY state").fetchall()
+    return {row[0]: row[1] for row in rows}
+
+def realtime_factor():
+    """Audio vs compute seconds over all finished jobs (cache hits excluded)."""
+    with db.get_pool().reader() as conn:
+        row = conn.execute("""
+            SELECT COUNT(*), SUM(audio_seconds), SUM(compute_seconds) FROM transcription_jobs
+            WHERE state='done' AND compute_seconds IS NOT NULL
+        """).fetchone()
+    jobs, audio, compute = row[0], row[1] or 0.0, row[2] or 0.0
+    return {"jobs": jobs, "audio_s": round(audio, 1), "compute_s": round(compute, 1),
+            "rtf": round(compute / audio, 3) if audio else 0}
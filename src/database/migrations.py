@@ -0,0 +1,294 @@
+import logging
+import pkgutil
+import importlib
+
+import database as db
+
+logger = logging.getLogger(__name__)
+
+# --- MIGRATION STEPS ---
+# Each step runs exactly once, in its own transaction, and bumps PRAGMA user_version.
+# Never edit a released step; append a new one instead.
+
+def _m001_base_schema(c):
+    c.execute('''CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY,
+        name TEXT, farm TEXT,
+        lat REAL, lon REAL,
+        p_time TEXT, v_time TEXT
+    )''')
+
+    c.execute('''CREATE TABLE IF NOT EXISTS landmarks (
+        user_id INTEGER,
+        landmark_id INTEGER,
+        label TEXT, env TEXT, medium TEXT,
+        PRIMARY KEY(user_id, landmark_id),
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    )''')
+
+    c.execute('''CREATE TABLE IF NOT EXISTS logs (
+        id TEXT PRIMARY KEY,
+        user_id INTEGER,
+        landmark_id INTEGER,
+        category TEXT,
+        status TEXT,
+        timestamp TEXT,
+        date TEXT,
+        weather_json TEXT,
+        transcription TEXT
+    )''')
+
+    c.execute('''CREATE TABLE IF NOT EXISTS media (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        log_id TEXT,
+        file_path TEXT,
+        file_type TEXT,
+        FOREIGN KEY(log_id) REFERENCES logs(id)
+    )''')
+
+    c.execute('''CREATE TABLE IF NOT EXISTS ai_interactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        log_id TEXT,
+        prompt TEXT,
+        response TEXT,
+        model_used TEXT,
+        rating INTEGER DEFAULT 0,
+        timestamp TEXT,
+        feedback_status TEXT DEFAULT 'NA',
+        feedback_note TEXT DEFAULT '',
+        FOREIGN KEY(log_id) REFERENCES logs(id)
+    )''')
+
+def _m002_per_user_landmark_ids(c):
+    """Pre-versioning databases keyed landmarks by a global 'id'. Re-key them to per-user IDs (1-20)."""
+    cols = [row[1] for row in c.execute("PRAGMA table_info(landmarks)").fetchall()]
+    if "landmark_id" in cols or "user_id" not in cols:
+        return
+
+    logger.info("Migrating landmarks to per-user ID schema...")
+    # 1. Backup old landmarks
+    c.execute("ALTER TABLE landmarks RENAME TO landmarks_old")
+
+    # 2. Create New Table
+    c.execute('''CREATE TABLE landmarks (
+        user_id INTEGER,
+        landmark_id INTEGER,
+        label TEXT, env TEXT, medium TEXT,
+        PRIMARY KEY(user_id, landmark_id),
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    )''')
+
+    # 3. Migrate Data & Re-index Logs
+    # We need to map old global IDs to new per-user IDs (1, 2, 3...)
+    old_lms = c.execute("SELECT * FROM landmarks_old ORDER BY user_id, id").fetchall()
+
+    user_counts = {}
+    for row in old_lms:
+        uid = row['user_id']
+        old_id = row['id']
+
+        # Skip reserved IDs during re-indexing
+        if old_id in [0, 99]: continue
+
+        # Generate new 1-20 ID
+        new_id = user_counts.get(uid, 0) + 1
+        user_counts[uid] = new_id
+
+        c.execute("""
+            INSERT INTO landmarks (user_id, landmark_id, label, env, medium)
+            VALUES (?, ?, ?, ?, ?)
+        """, (uid, new_id, row['label'], row['env'], row['medium']))
+
+        # CRITICAL: Update logs to use the new ID
+        c.execute("UPDATE logs SET landmark_id = ? WHERE user_id = ? AND landmark_id = ?", (new_id, uid, old_id))
+
+    c.execute("DROP TABLE landmarks_old")
+    logger.info("Landmark migration complete.")
+
+def _m003_ai_feedback_columns(c):
+    """ai_interactions tables created before feedback existed lack these columns."""
+    cols = [row[1] for row in c.execute("PRAGMA table_info(ai_interactions)").fetchall()]
+    if "feedback_status" not in cols:
+        c.execute("ALTER TABLE ai_interactions ADD COLUMN feedback_status TEXT DEFAULT 'NA'")
+    if "feedback_note" not in cols:
+        c.execute("ALTER TABLE ai_interactions ADD COLUMN feedback_note TEXT DEFAULT ''")
+
+def _m004_hot_query_indexes(c):
+    # Routine checks, pending spots, day view and date grid all filter logs by (user_id, date[, category])
+    c.execute("CREATE INDEX IF NOT EXISTS idx_logs_user_date_cat ON logs(user_id, date, category)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_media_log ON media(log_id)")
+
+def _m005_daily_progress(c):
+    # One row per (user, day, routine, spot): routine checks become primary-key lookups instead of log scans
+    c.execute('''CREATE TABLE IF NOT EXISTS daily_progress (
+        user_id INTEGER,
+        date TEXT,
+        category TEXT,
+        landmark_id INTEGER,
+        count INTEGER DEFAULT 0,
+        PRIMARY KEY(user_id, date, category, landmark_id)
+    ) WITHOUT ROWID''')
+    backfill_daily_progress(c)
+
+def _m006_transcription_jobs(c):
+    # Durable queue behind background transcription: survives restarts, retries with backoff
+    c.execute('''CREATE TABLE IF NOT EXISTS transcription_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        log_id TEXT,
+        user_id INTEGER,
+        file_path TEXT,
+        seq INTEGER DEFAULT 0,
+        state TEXT DEFAULT 'queued',
+        attempts INTEGER DEFAULT 0,
+        text TEXT,
+        error TEXT,
+        created_at TEXT,
+        updated_at TEXT,
+        next_attempt_at TEXT,
+        FOREIGN KEY(log_id) REFERENCES logs(id)
+    )''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_state_due ON transcription_jobs(state, next_attempt_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_log ON transcription_jobs(log_id)")
+
+def _m007_transcript_cache(c):
+    # Transcripts keyed by the SHA-256 of the audio: forwarded and re-downloaded notes skip Whisper
+    c.execute('''CREATE TABLE IF NOT EXISTS transcript_cache (
+        sha256 TEXT PRIMARY KEY,
+        text TEXT,
+        audio_bytes INTEGER,
+        hits INTEGER DEFAULT 0,
+        created_at TEXT,
+        last_used_at TEXT
+    ) WITHOUT ROWID''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_transcript_cache_lru ON transcript_cache(last_used_at)")
+
+def _m008_job_timings(c):
+    # Per-job audio length vs compute time, to track the real-time factor
+    cols = [row[1] for row in c.execute("PRAGMA table_info(transcription_jobs)").fetchall()]
+    if "audio_seconds" not in cols:
+        c.execute("ALTER TABLE transcription_jobs ADD COLUMN audio_seconds REAL")
+    if "compute_seconds" not in cols:
+        c.execute("ALTER TABLE transcription_jobs ADD COLUMN compute_seconds REAL")
+
+def _m009_weather_cache(c):
+    # Second tier of the weather cache, one row per lat/lon grid cell: survives restarts
+    c.execute('''CREATE TABLE IF NOT EXISTS weather_cache (
+        cell TEXT PRIMARY KEY,
+        data TEXT,
+        fetched_at REAL
+    ) WITHOUT ROWID''')
+
+def _m010_weather_jobs(c):
+    # Entries are saved before their weather arrives; one row per entry still waiting for it
+    c.execute('''CREATE TABLE IF NOT EXISTS weather_jobs (
+        log_id TEXT PRIMARY KEY,
+        lat REAL, lon REAL,
+        attempts INTEGER DEFAULT 0,
+        error TEXT,
+        created_at TEXT,
+        next_attempt_at TEXT,
+        FOREIGN KEY(log_id) REFERENCES logs(id)
+    ) WITHOUT ROWID''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_weather_jobs_due ON weather_jobs(next_attempt_at)")
+
+def _m011_users_p_time(c):
+    # The weather prefetch looks up every farm on a morning alert slot
+    c.execute("CREATE INDEX IF NOT EXISTS idx_users_p_time ON users(p_time)")
+
+MIGRATIONS = [
+    (1, "base schema", _m001_base_schema),
+    (2, "per-user landmark ids", _m002_per_user_landmark_ids),
+    (3, "ai feedback columns", _m003_ai_feedback_columns),
+    (4, "hot query indexes", _m004_hot_query_indexes),
+    (5, "daily progress table", _m005_daily_progress),
+    (6, "transcription jobs", _m006_transcription_jobs),
+    (7, "transcript cache", _m007_transcript_cache),
+    (8, "job timings", _m008_job_timings),
+    (9, "weather cache", _m009_weather_cache),
+    (10, "weather jobs", _m010_weather_jobs),
+    (11, "users p_time index", _m011_users_p_time),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# --- BACKFILLS ---
+def backfill_daily_progress(c, user_id=None):
+    """Rebuilds daily_progress from logs (all users, or one). Returns the number of rows written."""
+    where, params = ("WHERE user_id=?", (user_id,)) if user_id is not None else ("", ())
+    c.execute(f"DELETE FROM daily_progress {where}", params)
+    c.execute(f"""
+        INSERT INTO daily_progress (user_id, date, category, landmark_id, count)
+        SELECT user_id, date, category, landmark_id, COUNT(*) FROM logs {where}
+        GROUP BY user_id, date, category, landmark_id
+    """, params)
+    return c.execute(f"SELECT COUNT(*) FROM daily_progress {where}", params).fetchone()[0]
+
+# --- RUNNER ---
+def get_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn, target=LATEST_VERSION):
+    """Applies every step above the database's user_version. Returns the list of applied versions."""
+    current = get_version(conn)
+    applied = []
+    for version, name, step in MIGRATIONS:
+        if version <= current or version > target:
+            continue
+        logger.info(f"🛠️ Applying migration {version:03d}: {name}")
+        conn.commit()  # Make sure no implicit transaction is open
+        conn.execute("BEGIN")
+        try:
+            step(conn.cursor())
+            conn.execute(f"PRAGMA user_version={version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.error(f"Migration {version:03d} ({name}) failed, database left at version {get_version(conn)}.")
+            raise
+        applied.append(version)
+    return applied
+
+# --- QUERY PLAN CHECK ---
+SQL_VERBS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+def checked_queries():
+    """
+    HOT_QUERIES plus every SQL_* query constant of the database package, so a
+    new query is checked without anyone having to register it. Batched
+    '{}' lookups are filled with two placeholders.
+    """
+    queries = dict(db.HOT_QUERIES)
+    seen = set(queries.values())
+    modules = [db] + [importlib.import_module(f"database.{m.name}") for m in pkgutil.iter_modules(db.__path__)
+                      if m.name != "__main__"]
+    for module in modules:
+        short = module.__name__.split(".")[-1]
+        for attr, value in vars(module).items():
+            if not attr.startswith("SQL_") or not isinstance(value, str) or not value.lstrip().upper().startswith(SQL_VERBS):
+                continue
+            sql = value.format("?, ?") if "{}" in value else value
+            if sql not in seen:
+                seen.add(sql)
+                queries[f"{short}.{attr[4:].lower()}"] = sql
+    return queries
+
+def explain_hot_queries(conn):
+    """Returns {query_name: [plan detail lines]} from EXPLAIN QUERY PLAN, for every checked query."""
+    plans = {}
+    for name, sql in checked_queries().items():
+        # Parameter values don't change the plan, only their count matters
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", (1,) * sql.count("?")).fetchall()
+        plans[name] = [row[-1] for row in rows]
+    return plans
+
+def find_full_scans(plans):
+    """Names of queries whose plan walks a whole table instead of using an index."""
+    offenders = []
+    for name, details in plans.items():
+        for d in details:
+            # "SCAN (subquery-N)" walks an intermediate result, not a table
+            if d.startswith("SCAN") and "USING" not in d and not d.startswith("SCAN ("):
+                offenders.append(name)
+                break
+    return offenders
@@ -0,0 +1,232 @@
+import os
+import json
+import glob
+import time
+import atexit
+import logging
+import threading
+
+import database as db
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+JOURNAL_DIR = os.path.join(db.DB_DIR, "shadow")
+DEBOUNCE_SECONDS = float(os.getenv("SHADOW_DEBOUNCE", "2.0"))    # Coalesce writes inside this window
+COMPACT_EVERY = int(os.getenv("SHADOW_COMPACT_EVERY", "50"))       # Delta segments before compaction
+COMPACT_INTERVAL = float(os.getenv("SHADOW_COMPACT_INTERVAL", "3600"))
+
+# --- RECORD BUILDERS ---
+def _user_record(u):
+    return {
+        "id": u['id'], "name": u['name'], "farm": u['farm'],
+        "lat": u['lat'], "lon": u['lon'],
+        "p_time": u['p_time'], "v_time": u['v_time'],
+        "landmarks": u['landmarks']
+    }
+
+def _log_record(log, files):
+    return {
+        "id": log['id'],
+        "user_id": log['user_id'],
+        "landmark_id": log['landmark_id'],
+        "category": log['category'],
+        "status": log['status'],
+        "timestamp": log['timestamp'],
+        "date": log['date'],
+        "weather": json.loads(log['weather_json']) if log['weather_json'] else {},
+        "transcription": log['transcription'],
+        "files": files
+    }
+
+# --- FILE HELPERS ---
+def _atomic_write(path, write_fn):
+    """Writes to a temp file and renames it over the target, so readers never see half a file."""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        write_fn(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def _load_snapshots():
+    users, logs = {}, []
+    try:
+        with open(db.JSON_USERS) as f: users = json.load(f)
+    except (OSError, ValueError): pass
+    try:
+        with open(db.JSON_LOGS) as f: logs = json.load(f)
+    except (OSError, ValueError): pass
+    return users, logs
+
+def _write_snapshots(users, logs):
+    _atomic_write(db.JSON_USERS, lambda f: json.dump(users, f, indent=4))
+    _atomic_write(db.JSON_LOGS, lambda f: json.dump(logs, f, indent=4))
+
+# --- WORKER ---
+class ShadowSync:
+    """
+    Single background worker that mirrors SQLite into JSON.
+    Writes only mark rows as dirty; the worker coalesces them for DEBOUNCE_SECONDS,
+    appends the changed rows to a delta segment (journal/delta-N.jsonl) and
+    periodically compacts the segments into users.json / logs.json.
+    """
+    def __init__(self, journal_dir=JOURNAL_DIR, debounce=DEBOUNCE_SECONDS,
+                 compact_every=COMPACT_EVERY, compact_interval=COMPACT_INTERVAL):
+        self.journal_dir = journal_dir
+        self.debounce = debounce
+        self.compact_every = compact_every
+        self.compact_interval = compact_interval
+        self._cond = threading.Condition()
+        self._dirty_users = set()
+        self._dirty_logs = set()
+        self._full = False
+        self._busy = False
+        self._stopping = False
+        self._thread = None
+        self._seq = None
+        self._last_compact = time.monotonic()
+
+    # -- Producer side (any thread) --
+    def mark(self, users=(), logs=(), full=False):
+        with self._cond:
+            self._dirty_users.update(users)
+            self._dirty_logs.update(logs)
+            self._full = self._full or full
+            self._ensure_started()
+            self._cond.notify()
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="shadow-sync", daemon=True)
+            self._thread.start()
+
+    def _has_work(self):
+        return self._full or self._dirty_users or self._dirty_logs
+
+    # -- Worker side --
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._has_work() and not self._stopping:
+                    self._cond.wait()
+                if not self._has_work() and self._stopping:
+                    return
+            # Let a burst of writes pile up before touching the disk
+            if not self._stopping:
+                time.sleep(self.debounce)
+            with self._cond:
+                full, users, logs = self._full, self._dirty_users, self._dirty_logs
+                self._full, self._dirty_users, self._dirty_logs = False, set(), set()
+                self._busy = True
+            try:
+                if full:
+                    self.rebuild()
+                else:
+                    self._append_delta(users, logs)
+                    if self._should_compact():
+                        self.compact()
+            except Exception as e:
+                logger.error(f"Shadow Sync Failed: {e}")
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _segments(self):
+        return sorted(glob.glob(os.path.join(self.journal_dir, "delta-*.jsonl")))
+
+    def _next_seq(self):
+        if self._seq is None:
+            segs = self._segments()
+            self._seq = int(os.path.basename(segs[-1])[6:-6]) if segs else 0
+        self._seq += 1
+        return self._seq
+
+    def _append_delta(self, user_ids, log_ids):
+        records = []
+        if user_ids:
+            for u in db.fetch_users(user_ids):
+                records.append({"type": "user", "id": u['id'], "data": _user_record(u)})
+        if log_ids:
+            for log, files in db.iter_logs(log_ids):
+                records.append({"type": "log", "id": log['id'], "data": _log_record(log, files)})
+        if not records:
+            return
+
+        os.makedirs(self.journal_dir, exist_ok=True)
+        path = os.path.join(self.journal_dir, f"delta-{self._next_seq():08d}.jsonl")
+        _atomic_write(path, lambda f: f.writelines(json.dumps(r) + "\n" for r in records))
+
+    def _should_compact(self):
+        n = len(self._segments())
+        if n >= self.compact_every:
+            return True
+        return n > 0 and time.monotonic() - self._last_compact >= self.compact_interval
+
+    def compact(self):
+        """Folds every delta segment into the JSON snapshots, then removes the segments."""
+        segs = self._segments()
+        if not segs:
+            return
+        users, logs = _load_snapshots()
+        logs_by_id = {l['id']: l for l in logs}
+        for seg in segs:
+            with open(seg) as f:
+                for line in f:
+                    if not line.strip(): continue
+                    rec = json.loads(line)
+                    if rec['type'] == 'user':
+                        users[str(rec['id'])] = rec['data']
+                    else:
+                        logs_by_id[rec['id']] = rec['data']
+        logs = sorted(logs_by_id.values(), key=lambda l: l['timestamp'] or "", reverse=True)
+        _write_snapshots(users, logs)
+        for seg in segs:
+            os.remove(seg)
+        self._last_compact = time.monotonic()
+        logger.info(f"🗜️ Shadow journal compacted ({len(segs)} segments).")
+
+    def rebuild(self):
+        """Full mirror of the database (first run / manual repair). Supersedes the journal."""
+        users_dict = {str(u['id']): _user_record(u) for u in db.fetch_users()}
+        logs_list = [_log_record(log, files) for log, files in db.iter_logs()]
+        _write_snapshots(users_dict, logs_list)
+        for seg in self._segments():
+            os.remove(seg)
+        self._last_compact = time.monotonic()
+
+    def flush(self, timeout=None):
+        """Blocks until everything marked so far has reached the journal."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._has_work() or self._busy:
+                if self._thread is None or not self._thread.is_alive():
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout=10):
+        """Flushes pending rows, compacts the journal and stops the worker."""
+        with self._cond:
+            if self._thread is None:
+                return
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            # Compacting now would race the worker's own writes; the segments stay for the next compaction
+            logger.warning(f"Shadow worker still busy after {timeout}s, skipping shutdown compaction.")
+            return
+        self._thread = None
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"Shadow compaction on shutdown failed: {e}")
+
+worker = ShadowSync()
+atexit.register(worker.stop)
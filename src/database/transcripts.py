@@ -0,0 +1,79 @@
+import os
+import logging
+import threading
+from datetime import datetime
+
+import database as db
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+TRANSCRIPT_CACHE_SIZE = int(os.getenv("TRANSCRIPT_CACHE_SIZE", "5000"))  # Transcripts kept before LRU eviction
+
+SQL_TRANSCRIPT_BY_HASH = "SELECT text FROM transcript_cache WHERE sha256=?"
+SQL_TRANSCRIPT_LRU = "SELECT sha256 FROM transcript_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?"
+
+db.HOT_QUERIES.update({
+    "transcript_by_hash": SQL_TRANSCRIPT_BY_HASH,
+    "transcript_lru": SQL_TRANSCRIPT_LRU,
+})
+
+# --- COUNTERS ---
+# Per process, like the profile cache: enough to judge the hit rate since the last restart
+_lock = threading.Lock()
+hits = 0
+misses = 0
+
+def _count(hit):
+    global hits, misses
+    with _lock:
+        if hit:
+            hits += 1
+        else:
+            misses += 1
+
+# --- LOOKUP ---
+def lookup(sha256):
+    """Cached transcript for this audio hash ("" for known silence), or None on a miss."""
+    with db.get_pool().reader() as conn:
+        row = conn.execute(SQL_TRANSCRIPT_BY_HASH, (sha256,)).fetchone()
+    _count(row is not None)
+    if row is None:
+        return None
+    db.writes.submit(*_op_touch(sha256))  # LRU bookkeeping, nobody waits on it
+    return row['text']
+
+# --- WRITE OPS ---
+def _op_touch(sha256):
+    def op(conn):
+        conn.execute("UPDATE transcript_cache SET hits=hits+1, last_used_at=? WHERE sha256=?",
+                     (datetime.now().isoformat(), sha256))
+    return op, None
+
+def _op_store(sha256, text, audio_bytes=None, max_entries=None):
+    """Saves a transcript and evicts the least recently used ones beyond max_entries."""
+    def op(conn):
+        now = datetime.now().isoformat()
+        conn.execute("""
+            INSERT INTO transcript_cache (sha256, text, audio_bytes, created_at, last_used_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(sha256) DO UPDATE SET text=excluded.text, last_used_at=excluded.last_used_at
+        """, (sha256, text, audio_bytes, now, now))
+        limit = max_entries or TRANSCRIPT_CACHE_SIZE
+        conn.execute(f"DELETE FROM transcript_cache WHERE sha256 IN ({SQL_TRANSCRIPT_LRU})", (limit,))
+    return op, None
+
+# --- BLOCKING API ---
+def store(sha256, text, audio_bytes=None):
+    db.writes.execute(*_op_store(sha256, text, audio_bytes))
+
+def stats():
+    with db.get_pool().reader() as conn:
+        entries = conn.execute("SELECT COUNT(*) FROM transcript_cache").fetchone()[0]
+    with _lock:
+        total = hits + misses
+        return {
+            "entries": entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 3) if total else 0,
+        }
@@ -0,0 +1,31 @@
+import json
+import logging
+
+import database as db
+
+logger = logging.getLogger(__name__)
+
+SQL_WEATHER_BY_CELL = "SELECT data, fetched_at FROM weather_cache WHERE cell=?"
+
+db.HOT_QUERIES["weather_by_cell"] = SQL_WEATHER_BY_CELL
+
+# --- LOOKUP ---
+def lookup(cell, fresh_after):
+    """(data, fetched_at) for a grid cell fetched after `fresh_after` (epoch seconds), else None."""
+    with db.get_pool().reader() as conn:
+        row = conn.execute(SQL_WEATHER_BY_CELL, (cell,)).fetchone()
+    if row is None or row['fetched_at'] < fresh_after:
+        return None
+    return json.loads(row['data']), row['fetched_at']
+
+# --- WRITE OPS ---
+def _op_store(cell, data, fetched_at, stale_before=None):
+    """Saves a cell's weather; rows older than stale_before are dropped in the same transaction."""
+    def op(conn):
+        conn.execute("""
+            INSERT INTO weather_cache (cell, data, fetched_at) VALUES (?, ?, ?)
+            ON CONFLICT(cell) DO UPDATE SET data=excluded.data, fetched_at=excluded.fetched_at
+        """, (cell, json.dumps(data), fetched_at))
+        if stale_before is not None:
+            conn.execute("DELETE FROM weather_cache WHERE fetched_at < ?", (stale_before,))
+    return op, None
@@ -0,0 +1,199 @@
+import os
+import time
+import queue
+import asyncio
+import atexit
+import logging
+import threading
+from concurrent.futures import Future
+
+import database as db
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+BATCH_WINDOW_MS = float(os.getenv("WRITE_BATCH_MS", "10"))    # Max wait for more writes before committing
+BATCH_MAX = int(os.getenv("WRITE_BATCH_MAX", "200"))           # Max writes per transaction
+QUEUE_SIZE = int(os.getenv("WRITE_QUEUE_SIZE", "4096"))
+
+# --- GROUP COMMIT QUEUE ---
+class GroupCommitQueue:
+    """
+    Write-behind queue: one thread drains pending writes and applies up to
+    BATCH_MAX of them (or whatever arrives within BATCH_WINDOW_MS) in a single
+    transaction, so a burst of check-ins pays for one WAL fsync instead of one each.
+
+    A write is an op(conn) callable plus an optional on_commit() hook. Each op runs
+    inside its own SAVEPOINT, so a failing op only fails its own future.
+    """
+    def __init__(self, window_ms=BATCH_WINDOW_MS, max_batch=BATCH_MAX, maxsize=QUEUE_SIZE, name="db-writer"):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.name = name
+        self._queue = queue.Queue(maxsize)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._idle = threading.Condition()
+        self._in_flight = 0
+        self.batches = 0
+        self.ops = 0
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+
+    # -- Producer side --
+    def submit(self, op, on_commit=None):
+        """Queues a write from any thread and returns a Future with op's return value."""
+        self._ensure_started()
+        fut = Future()
+        self._track(1)
+        self._queue.put((op, on_commit, fut))
+        return fut
+
+    def execute(self, op, on_commit=None):
+        """Blocking submit(): returns once the write is committed."""
+        return self.submit(op, on_commit).result()
+
+    async def run(self, op, on_commit=None):
+        """Awaitable submit(). Backs off to a helper thread when the queue is full."""
+        self._ensure_started()
+        fut = Future()
+        item = (op, on_commit, fut)
+        self._track(1)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            logger.debug("Write queue full, caller is waiting for a slot.")
+            await asyncio.to_thread(self._queue.put, item)
+        return await asyncio.wrap_future(fut)
+
+    def _track(self, delta):
+        with self._idle:
+            self._in_flight += delta
+            if self._in_flight == 0:
+                self._idle.notify_all()
+
+    # -- Worker side --
+    def _collect(self, first):
+        """
+        Gathers a batch: the first item plus whatever arrives inside the window.
+        Stops early once every submitted write is already in the batch, so a lone
+        write (or a small burst whose callers are all waiting) commits immediately.
+        """
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            with self._idle:
+                if self._in_flight <= len(batch) and self._queue.empty():
+                    break
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch, stopping = self._collect(item)
+            try:
+                self._commit(batch)
+            finally:
+                self._track(-len(batch))
+            if stopping:
+                break
+
+    def _commit(self, batch):
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        results = []
+        try:
+            with db.get_pool().writer() as conn:
+                conn.commit()  # Make sure no implicit transaction is open
+                conn.execute("BEGIN")
+                for op, _, _ in batch:
+                    conn.execute("SAVEPOINT write_op")
+                    try:
+                        results.append((True, op(conn)))
+                        conn.execute("RELEASE write_op")
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO write_op")
+                        conn.execute("RELEASE write_op")
+                        results.append((False, e))
+        except Exception as e:
+            logger.error(f"Write batch of {len(batch)} failed: {e}")
+            for _, _, fut in batch:
+                fut.set_exception(e)
+            return
+
+        self.batches += 1
+        self.ops += len(batch)
+        for (op, on_commit, fut), (ok, value) in zip(batch, results):
+            if not ok:
+                fut.set_exception(value)
+                continue
+            if on_commit is not None:
+                try:
+                    on_commit()
+                except Exception as e:
+                    logger.error(f"Post-commit hook failed: {e}")
+            fut.set_result(value)
+
+    # -- Lifecycle --
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "ops": self.ops,
+            "avg_batch": round(self.ops / self.batches, 1) if self.batches else 0,
+            "queued": self.queue_depth,
+        }
+
+    def flush(self, timeout=None):
+        """Blocks until every write submitted so far is committed (or failed)."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._in_flight == 0, timeout)
+
+    def shutdown(self, wait=True):
+        """Commits everything still queued, then stops the thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        if wait:
+            self._thread.join()
+        self._thread = None
+
+write_queue = GroupCommitQueue()
+atexit.register(write_queue.shutdown)
+
+def submit(op, on_commit=None):
+    return write_queue.submit(op, on_commit)
+
+def execute(op, on_commit=None):
+    return write_queue.execute(op, on_commit)
+
+async def run(op, on_commit=None):
+    return await write_queue.run(op, on_commit)
+
+def flush(timeout=None):
+    return write_queue.flush(timeout)
+
+def shutdown(wait=True):
+    write_queue.shutdown(wait)
+
+def stats():
+    return write_queue.stats()
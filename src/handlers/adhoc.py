@@ -1,14 +1,13 @@
 import os
 import io
-import asyncio
 import logging
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import ContextTypes, ConversationHandler, MessageHandler, CallbackQueryHandler, CommandHandler, filters
 
 import database as db
 from utils.files import save_telegram_file
-from utils.transcriber import transcribe_audio
-from utils.weather import get_weather_data
+from utils.transcriber import wake_jobs
+from utils.weather import wake_enrichment
 from handlers.router import route_intent
 from utils.menus import MAIN_MENU_KBD
 
@@ -16,17 +15,9 @@ logger = logging.getLogger(__name__)
 
 (ADHOC_BUFFER, ADHOC_TAG) = range(2)
 
-async def run_transcription_bg(file_path, entry_id):
-    if not file_path or not os.path.exists(file_path): return
-    try:
-        loop = asyncio.get_running_loop()
-        text = await loop.run_in_executor(None, transcribe_audio, file_path)
-        if text: db.update_transcription(entry_id, text)
-    except Exception: pass
-
 async def start_adhoc_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
-    user = db.get_user_profile(user_id)
+    user = await db.aio.get_user_profile(user_id)
     if not user:
         await update.message.reply_text(
             "⚠️ **Registration Required**\n\n"
@@ -54,7 +45,7 @@ async def start_adhoc_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def start_adhoc_direct(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
-    user = db.get_user_profile(user_id)
+    user = await db.aio.get_user_profile(user_id)
     if not user:
         await update.message.reply_text(
             "⚠️ **Registration Required**\n\n"
@@ -223,7 +214,7 @@ async def ask_tag(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return ConversationHandler.END
     
     user_id = query.from_user.id
-    landmarks = db.get_user_landmarks(user_id)
+    landmarks = await db.aio.get_user_landmarks(user_id)
     
     kb = []
     row = []
@@ -243,7 +234,7 @@ async def finalize_adhoc(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer()
     
     user_id = update.effective_user.id
-    user = db.get_user_profile(user_id)
+    user = await db.aio.get_user_profile(user_id)
     
     # FIX: Get the ID directly from the button pattern "tag_{id}"
     # This prevents the KeyError 'adhoc_tag'
@@ -265,29 +256,28 @@ async def finalize_adhoc(update: Update, context: ContextTypes.DEFAULT_TYPE):
         path = save_telegram_file(buf, user.id, user.farm_name, lm_id, f"adhoc_note{i}")
         saved_paths[f"voice_{i}"] = path
         bg_voices.append(path)
-        
-    # Fetch weather asynchronously
-    weather = await get_weather_data(user.latitude, user.longitude)
     
     # --- DB CALL UPDATED ---
-    entry_id = db.create_entry(
+    # Weather is filled in by the background enricher: the farmer doesn't wait on the API
+    await db.aio.create_entry(
         user.id, 
         lm_id, 
         saved_paths, 
         "Observation", 
-        weather or {}, 
+        {}, 
         category='adhoc',
-        transcription="⏳ Transcribing..." if bg_voices else ""
+        transcription="⏳ Transcribing..." if bg_voices else "",
+        transcribe=bg_voices,
+        weather_at=user.location
     )
-    
-    for v in bg_voices:
-        context.application.create_task(run_transcription_bg(v, entry_id))
+    wake_jobs()
+    wake_enrichment()
         
     # Get Name for confirmation
     if lm_id == 99:
         saved_to = "General Observation"
     else:
-        lm = db.get_landmark_by_id(user_id, lm_id)
+        lm = await db.aio.get_landmark_by_id(user_id, lm_id)
         saved_to = lm.label if lm else f"Spot {lm_id}"
         
     await query.edit_message_text(f"✅ **Ad-Hoc Entry Saved to {saved_to}**")
@@ -1,3 +1,4 @@
+import io
 import os
 import logging
 from telegram import Update, ReplyKeyboardRemove, ReplyKeyboardMarkup, InlineKeyboardMarkup, InlineKeyboardButton
@@ -5,7 +6,7 @@ from telegram.ext import ContextTypes, ConversationHandler, CommandHandler, Mess
 
 import database as db
 from utils.files import save_telegram_file
-from utils.transcriber import transcribe_audio
+from utils.transcriber import transcribe_audio, is_ready
 from utils.weather import get_weather_data
 from utils.ai_agent.ai_agent import ask_ai
 from utils.menus import MAIN_MENU_KBD, BTN_AI
@@ -20,7 +21,7 @@ AI_FEEDBACK_NOTE = 3
 # --- ENTRY POINT ---
 async def start_ai_chat(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
-    user = db.get_user_profile(user_id)
+    user = await db.aio.get_user_profile(user_id)
     
     if not user:
         await update.message.reply_text(
@@ -103,7 +104,7 @@ async def handle_ai_photo_text(update: Update, context: ContextTypes.DEFAULT_TYP
 # --- STEP 2: HANDLE CONTEXT & EXECUTE ---
 async def handle_ai_context(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
-    user = db.get_user_profile(user_id)
+    user = await db.aio.get_user_profile(user_id)
     
     # Notify immediately
     status_msg = await update.message.reply_text("⏳ **Analyzing...**")
@@ -112,20 +113,16 @@ async def handle_ai_context(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_query = ""
     
     if update.message.voice:
-        # Handle Voice
+        # Handle Voice (kept in memory: the question is transient, nothing to archive)
         f = await update.message.voice.get_file()
-        voice_path = f"data/media/{user_id}_ai_voice.ogg"
-        await f.download_to_drive(voice_path)
+        voice_buf = io.BytesIO()
+        await f.download_to_memory(voice_buf)
+
+        if not is_ready():
+            await status_msg.edit_text("⏳ **Analyzing...**\n🎙 Voice recognition is still starting up, this one may take a little longer.")
         
         # Transcribe (awaiting the async function we fixed earlier)
-        user_query = await transcribe_audio(voice_path)
-        
-        # Cleanup voice file immediately
-        try:
-            if os.path.exists(voice_path):
-                os.remove(voice_path)
-        except:
-            pass
+        user_query = await transcribe_audio(voice_buf, user_id)
 
         if not user_query:
             user_query = "Analyze this image and identify issues." # Fallback
@@ -180,7 +177,7 @@ async def run_ai_job(msg_obj, query_text, images, user_id, weather, location):
         model = response['model_used']
         
         # Log to DB and get ID
-        log_id = db.log_ai_interaction(user_id, query_text, result_text, model)
+        log_id = await db.aio.log_ai_interaction(user_id, query_text, result_text, model)
         
         # 5. Deliver Result as New Message
         final_msg = f"🤖 **AI Insight:**\n\n{result_text}"
@@ -239,7 +236,7 @@ async def handle_feedback_click(update: Update, context: ContextTypes.DEFAULT_TY
     status = parts[2]
     
     # Update DB
-    db.update_ai_feedback(log_id, status)
+    await db.aio.update_ai_feedback(log_id, status)
     
     # Store ID in context
     context.user_data['fb_log_id'] = log_id
@@ -266,16 +263,14 @@ async def handle_feedback_note(update: Update, context: ContextTypes.DEFAULT_TYP
     if update.message and update.message.voice:
         # Handle voice note feedback
         f = await update.message.voice.get_file()
-        path = f"data/media/{update.effective_user.id}_fb_voice.ogg"
-        await f.download_to_drive(path)
-        note = await transcribe_audio(path)
-        try: os.remove(path)
-        except: pass
+        buf = io.BytesIO()
+        await f.download_to_memory(buf)
+        note = await transcribe_audio(buf, update.effective_user.id)
     elif update.message and update.message.text:
         note = update.message.text
     
     if note:
-        db.update_ai_feedback(log_id, status, note)
+        await db.aio.update_ai_feedback(log_id, status, note)
         await update.message.reply_text("🙏 Thank you for your feedback!")
     
     return ConversationHandler.END
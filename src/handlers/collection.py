@@ -7,8 +7,8 @@ from telegram.ext import ContextTypes, ConversationHandler, CommandHandler, Mess
 
 import database as db
 from utils.files import save_telegram_file
-from utils.transcriber import transcribe_audio
-from utils.weather import get_weather_data
+from utils.transcriber import wake_jobs
+from utils.weather import wake_enrichment
 from utils.menus import MAIN_MENU_KBD
 from handlers.router import route_intent
 
@@ -18,25 +18,14 @@ logger = logging.getLogger(__name__)
 (CAPTURE_WIDE, CAPTURE_CLOSE, CAPTURE_SOIL, CONFIRM_PHOTOS, LOG_STATUS, VOICE_LOOP) = range(6)
 
 
-# --- HELPERS ---
-async def run_transcription_bg(file_path, entry_id):
-    if not file_path or not os.path.exists(file_path): return
-    try:
-        text = await transcribe_audio(file_path)
-        if text: 
-            db.update_transcription(entry_id, text)
-    except Exception as e:
-        logger.error(f"Background Transcription Failed: {e}")
-
-
 # --- MORNING FLOW START ---
 async def start_collection(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
-    if db.is_routine_done(user_id, 'morning'):
+    if await db.aio.is_routine_done(user_id, 'morning'):
         await update.message.reply_text("✅ You've already completed your morning check-in today!")
         return ConversationHandler.END    
     
-    user = db.get_user_profile(user_id)
+    user = await db.aio.get_user_profile(user_id)
     if not user or not user.landmarks:
         await update.message.reply_text("⚠️ You have no landmarks set up. Use /start to configure them.")
         return ConversationHandler.END
@@ -151,7 +140,7 @@ async def handle_voice(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def finalize_spot(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    user = db.get_user_profile(update.effective_user.id)
+    user = await db.aio.get_user_profile(update.effective_user.id)
     
     # Get the current landmark
     lm = context.user_data['queue'][context.user_data['current_ptr']]
@@ -171,20 +160,19 @@ async def finalize_spot(update: Update, context: ContextTypes.DEFAULT_TYPE):
         path = save_telegram_file(v_buf, user.id, user.farm_name, lm.id, f"note_{i}")
         saved_paths[f"voice_{i}"] = path
         bg_voices.append(path)
-        
-    # Get weather right before saving (non-blocking now)
-    weather = await get_weather_data(user.latitude, user.longitude)
     
     # --- DB CALL (SQLite) ---
-    entry_id = db.create_entry(
+    # Weather is filled in by the background enricher: the farmer doesn't wait on the API
+    await db.aio.create_entry(
         user.id, lm.id, saved_paths, 
         context.user_data['temp_status'], 
-        weather or {},
-        category='morning' 
+        {},
+        category='morning',
+        transcribe=bg_voices,
+        weather_at=user.location
     )
-    
-    for v in bg_voices:
-        context.application.create_task(run_transcription_bg(v, entry_id))
+    wake_jobs()
+    wake_enrichment()
 
     await query.edit_message_text(f"✅ **Saved: {lm.label}**")
     context.user_data['current_ptr'] += 1
@@ -193,7 +181,7 @@ async def finalize_spot(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # --- EVENING FLOW ---
 async def start_evening_flow(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
-    if db.is_routine_done(user_id, 'evening'):
+    if await db.aio.is_routine_done(user_id, 'evening'):
         await update.message.reply_text("✅ You've already recorded your evening summary today!")
         return ConversationHandler.END
 
@@ -210,19 +198,19 @@ async def save_evening_note(update: Update, context: ContextTypes.DEFAULT_TYPE):
     f = await update.message.voice.get_file()
     buf = io.BytesIO()
     await f.download_to_memory(buf)
-    user = db.get_user_profile(update.effective_user.id)
+    user = await db.aio.get_user_profile(update.effective_user.id)
     
     saved_path = save_telegram_file(buf, user.id, user.farm_name, 0, "daily_summary")
     
     # --- DB CALL (SQLite) ---
-    entry_id = db.create_entry(
+    await db.aio.create_entry(
         user.id, 0, {"voice_path": saved_path}, 
         "Summary", {}, 
         category='evening',
-        transcription="⏳ Transcribing..."
+        transcription="⏳ Transcribing...",
+        transcribe=[saved_path]
     )
-    
-    context.application.create_task(run_transcription_bg(saved_path, entry_id))
+    wake_jobs()
     
     await update.message.reply_text("✅ **Summary Saved.**", reply_markup=MAIN_MENU_KBD)
     return ConversationHandler.END
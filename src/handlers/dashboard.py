@@ -18,7 +18,7 @@ ITEMS_PER_PAGE = 5  # Pagination Limit
 # --- ENTRY POINT ---
 async def view_dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Displays the Farm Profile and List of Landmarks with Pagination."""
-    user = db.get_user_profile(update.effective_user.id)
+    user = await db.aio.get_user_profile(update.effective_user.id)
     if not user:
         msg = "⚠️ No profile found. Use /start."
         if update.message: await update.message.reply_text(msg)
@@ -133,7 +133,7 @@ async def handle_dash_nav(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # --- EDIT MENU HELPER (The Anchor) ---
 async def show_edit_menu(update: Update, context: ContextTypes.DEFAULT_TYPE, lm_id: int):
     """Refreshes the specific landmark edit menu."""
-    user = db.get_user_profile(update.effective_user.id)
+    user = await db.aio.get_user_profile(update.effective_user.id)
     landmark = next((l for l in user.landmarks if l.id == lm_id), None)
     
     if not landmark:
@@ -174,11 +174,11 @@ async def handle_edit_action(update: Update, context: ContextTypes.DEFAULT_TYPE)
         
     if action == "edit_delete":
         lm_id = context.user_data.get('edit_lm_id')
-        user = db.get_user_profile(update.effective_user.id)
+        user = await db.aio.get_user_profile(update.effective_user.id)
         
         # Safe Delete
         user.landmarks = [l for l in user.landmarks if l.id != lm_id]
-        db.save_user_profile(user.to_dict())
+        await db.aio.save_user_profile(user.to_dict())
         
         await query.edit_message_text("🗑️ **Spot deleted.**")
         return await view_dashboard(update, context)
@@ -213,7 +213,7 @@ async def save_up_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ **Invalid Format.** Try '08:30', '8am', or just '8'.")
         return DASH_UP_PHOTO
         
-    db.update_user_schedule(user_id, p_time=new_time)
+    await db.aio.update_user_schedule(user_id, p_time=new_time)
     await update.message.reply_text(f"✅ Morning alert set to {new_time}.\n\n**Update Evening Alert Time:**\n_(e.g. '6pm' or '18:30')_")
     return DASH_UP_VOICE
 
@@ -231,10 +231,10 @@ async def save_up_voice(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ **Invalid Format.** Try '18:00', '6pm', or just '6'.")
         return DASH_UP_VOICE
         
-    db.update_user_schedule(user_id, v_time=new_time)
+    await db.aio.update_user_schedule(user_id, v_time=new_time)
     
     # Sync live JobQueue
-    user = db.get_user_profile(user_id)
+    user = await db.aio.get_user_profile(user_id)
     
     await schedule_user_jobs(context.application, user_id, user.photo_time, user.voice_time)
     
@@ -248,7 +248,7 @@ async def save_rename(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if res is not None:
         return res
         
-    user = db.get_user_profile(update.effective_user.id)
+    user = await db.aio.get_user_profile(update.effective_user.id)
     lm_id = context.user_data.get('edit_lm_id')
     new_name = update.message.text
     
@@ -257,7 +257,7 @@ async def save_rename(update: Update, context: ContextTypes.DEFAULT_TYPE):
             lm.label = new_name
             break
             
-    db.save_user_profile(user.to_dict())
+    await db.aio.save_user_profile(user.to_dict())
     await update.message.reply_text(f"✅ Renamed to **{new_name}**", parse_mode='Markdown')
     # Return to Anchor
     return await show_edit_menu(update, context, lm_id)
@@ -265,28 +265,28 @@ async def save_rename(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def save_env(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    user = db.get_user_profile(update.effective_user.id)
+    user = await db.aio.get_user_profile(update.effective_user.id)
     lm_id = context.user_data.get('edit_lm_id')
     
     for lm in user.landmarks:
         if lm.id == lm_id:
             lm.env = query.data
             break
-    db.save_user_profile(user.to_dict())
+    await db.aio.save_user_profile(user.to_dict())
     # Return to Anchor
     return await show_edit_menu(update, context, lm_id)
 
 async def save_med(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    user = db.get_user_profile(update.effective_user.id)
+    user = await db.aio.get_user_profile(update.effective_user.id)
     lm_id = context.user_data.get('edit_lm_id')
     
     for lm in user.landmarks:
         if lm.id == lm_id:
             lm.medium = query.data
             break
-    db.save_user_profile(user.to_dict())
+    await db.aio.save_user_profile(user.to_dict())
     # Return to Anchor
     return await show_edit_menu(update, context, lm_id)
 
@@ -320,7 +320,7 @@ async def add_spot_final(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
     
-    user = db.get_user_profile(update.effective_user.id)
+    user = await db.aio.get_user_profile(update.effective_user.id)
     new_lm = {
         "label": context.user_data['new_spot_name'],
         "env": context.user_data['new_spot_env'],
@@ -329,7 +329,7 @@ async def add_spot_final(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     # Let DB handle ID generation (ID is None here)
     user.landmarks.append(db.Landmark(new_lm))
-    db.save_user_profile(user.to_dict())
+    await db.aio.save_user_profile(user.to_dict())
     
     await query.edit_message_text(f"✅ **Added: {new_lm['label']}**")
     return await view_dashboard(update, context)
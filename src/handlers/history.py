@@ -13,7 +13,7 @@ ITEMS_PER_PAGE = 6
 
 async def view_history(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
-    user = db.get_user_profile(user_id)
+    user = await db.aio.get_user_profile(user_id)
     if not user:
         if update.message:
             await update.message.reply_text(
@@ -70,7 +70,7 @@ async def show_single_day_summary(update, context, data_key):
         title = "Yesterday"
         
     d_str = target.strftime("%Y-%m-%d")
-    entries = db.get_entries_for_date(user_id, d_str)
+    entries = await db.aio.fetch_entries(user_id, d_str, d_str)
     
     # 1. Grouping Logic
     groups = {} # landmark_id -> [entries]
@@ -113,7 +113,7 @@ async def show_single_day_summary(update, context, data_key):
         lines.append(f"{icon} **{name}**: {summary_status}")
 
     # Check Morning Status
-    pending = db.get_pending_landmark_ids(user_id)
+    pending = await db.aio.get_pending_landmark_ids(user_id)
     am_status = "✅ Done" if not pending else f"⚠️ {len(pending)} Pending"
     if 'yesterday' in data_key: am_status = "n/a"
     
@@ -141,7 +141,7 @@ async def show_date_grid(update: Update, context: ContextTypes.DEFAULT_TYPE):
     end_date = datetime.datetime.now().date()
     start_date = end_date - datetime.timedelta(days=days)
     
-    data_map = db.get_entries_by_date_range(user_id, start_date, end_date)
+    data_map = await db.aio.get_entries_by_date_range(user_id, start_date, end_date)
     available_dates = sorted(data_map.keys(), reverse=True)
     
     if not available_dates:
@@ -198,7 +198,7 @@ async def show_date_details(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     date_str = query.data.replace("view_date_", "")
     user_id = update.effective_user.id
-    entries = db.get_entries_for_date(user_id, date_str)
+    entries = await db.aio.fetch_entries(user_id, date_str, date_str)
     
     if not entries:
         await query.message.reply_text("No logs found for this date.")
@@ -15,7 +15,7 @@ logger = logging.getLogger(__name__)
 
 # --- ENTRY POINT ---
 async def start_onboarding(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    user = db.get_user_profile(update.effective_user.id)
+    user = await db.aio.get_user_profile(update.effective_user.id)
     if user:
         await update.message.reply_text(f"👋 **Welcome back, {user.full_name}!**", parse_mode='Markdown')
         return ConversationHandler.END
@@ -242,7 +242,7 @@ async def finish_onboarding(update_obj, context: ContextTypes.DEFAULT_TYPE):
         'landmarks': current_list
     }
     
-    db.save_user_profile(profile)
+    await db.aio.save_user_profile(profile)
 
     await schedule_user_jobs(
         context.application, 
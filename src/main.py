@@ -1,4 +1,5 @@
 import os
+import time
 import logging
 import pytz
 from dotenv import load_dotenv
@@ -11,6 +12,8 @@ from telegram.ext import (
 
 import database as db
 from utils.menus import MAIN_MENU_KBD, MENU_BUTTONS
+from utils import transcriber
+from utils import weather
 # Import Scheduler Tools
 from utils.scheduler import restore_scheduled_jobs, send_debug_alert, schedule_user_jobs
 
@@ -26,6 +29,8 @@ load_dotenv()
 TOKEN = os.getenv("TELEGRAM_TOKEN")
 
 logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
+# httpx logs every request URL at INFO, and the Agro API key travels in the query string
+logging.getLogger("httpx").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
 # --- DEBUG COMMANDS (JOBS) ---
@@ -61,6 +66,41 @@ async def cmd_alert(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.job_queue.run_once(send_debug_alert, delay, user_id=user_id, data=f"Test fired after {delay}s")
     await update.message.reply_text(f"🚀 **Debug Alert** scheduled in {delay} seconds.", parse_mode='Markdown')
 
+async def cmd_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/stats - Cache and queue counters for debugging."""
+    profiles = db.cache.profiles.stats()
+    writes = db.writes.stats()
+    asr = transcriber.stats()
+    jobs = await db.aio.job_counts()
+    transcripts = await db.aio.transcript_stats()
+    rtf = await db.aio.job_realtime_factor()
+    wx = weather.stats()
+    wx_pending = await db.aio.pending_weather()
+    breaker = wx['breaker']
+
+    lines = [
+        "📈 **Runtime Stats:**",
+        f"👤 Profile cache: {profiles['size']} users, {profiles['hits']} hits / {profiles['misses']} misses "
+        f"({profiles['hit_rate']:.0%}), v{profiles['version']}",
+        f"💾 Write queue: {writes['ops']} writes in {writes['batches']} batches "
+        f"(avg {writes['avg_batch']}), {writes['queued']} queued",
+        f"🗄 DB executor queue: {db.aio.queue_depth()}",
+        f"🎙 Transcription: {asr['running']}/{asr['workers']} workers busy, {asr['queued']} queued, "
+        f"{asr['completed']} done, {asr['failed']} failed, {asr['batches']} batches (avg {asr['avg_batch']}), {asr['splits']} split",
+        f"   • {asr['audio_s']}s audio ({asr['speech_s']}s speech) in {asr['compute_s']}s compute, RTF {asr['rtf']}",
+    ]
+    for lane, s in asr['lanes'].items():
+        lines.append(f"   • {lane}: {s['queued']} queued, wait p50 {s['p50_ms']} ms / p95 {s['p95_ms']} ms / max {s['max_ms']} ms")
+    lines.append(f"📋 Transcription jobs: {jobs.get('queued', 0)} queued, {jobs.get('running', 0)} running, "
+                 f"{jobs.get('failed', 0)} failed, RTF {rtf['rtf']} over {rtf['jobs']} jobs")
+    lines.append(f"♻️ Transcript cache: {transcripts['entries']} clips, {transcripts['hits']} hits / "
+                 f"{transcripts['misses']} misses ({transcripts['hit_rate']:.0%})")
+    lines.append(f"🌦 Weather cache: {wx['cells']} cells, {wx['memory_hits']} memory / {wx['sqlite_hits']} SQLite hits, "
+                 f"{wx['misses']} fetches, {wx['prefetched']} prefetched, {wx['errors']} errors ({wx['hit_rate']:.0%}), {wx_pending} entries waiting")
+    lines.append(f"🔌 Weather API circuit: {breaker['state']}, {breaker['consecutive_failures']} failures in a row, "
+                 f"{breaker['trips']} trips, {breaker['rejected']} calls refused, {wx['negative_hits']} failed-area skips")
+    await update.message.reply_text("\n".join(lines), parse_mode='Markdown')
+
 # --- GLOBAL CANCEL ---
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Universal reset."""
@@ -83,7 +123,7 @@ async def global_router(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return 
 
     # 2. PROMPT UNREGISTERED USERS
-    user = db.get_user_profile(user_id)
+    user = await db.aio.get_user_profile(user_id)
     
     if not user:
         # Instead of calling start_onboarding directly (which doesn't enter the conversation state),
@@ -119,6 +159,12 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> N
 
 # --- STARTUP LOGIC ---
 async def post_init(application: Application):
+    start = time.perf_counter()
+    # Whisper workers load in the background while the rest of startup runs
+    transcriber.start_warm_up()
+    await weather.open_session()
+    # Background weather for saved entries (resumes the ones the last run left waiting)
+    await weather.start_enrichment()
     await application.bot.set_my_commands([
         BotCommand("start", "🏠 Home"),
         BotCommand("jobs", "🕰 Check Schedule"),
@@ -127,6 +173,21 @@ async def post_init(application: Application):
     ])
     # Restore jobs from DB
     await restore_scheduled_jobs(application)
+    # Resume voice notes left queued (or mid-transcription) by the last run
+    await transcriber.start_jobs()
+    logger.info(f"🚀 Startup finished in {time.perf_counter() - start:.2f}s (transcriber ready: {transcriber.is_ready()}).")
+
+async def post_shutdown(application: Application):
+    # Unfinished transcription jobs stay in the DB and resume on the next start
+    await transcriber.stop_jobs()
+    transcriber.shutdown()
+    # Unfilled entries stay queued in weather_jobs and are picked up on the next start
+    await weather.stop_enrichment()
+    await weather.close_session()
+    # Let queued DB calls finish before the process exits
+    db.aio.shutdown()
+    db.writes.shutdown()  # Commit batched writes before the shadow's final compaction
+    db.shadow.worker.stop()
 
 if __name__ == '__main__':
     db.init_db() # Run migrations and setup
@@ -135,7 +196,7 @@ if __name__ == '__main__':
     # 1. Timezone is critical for scheduler
     defaults = Defaults(tzinfo=pytz.timezone('Asia/Dubai'))
     
-    app = ApplicationBuilder().token(TOKEN).defaults(defaults).post_init(post_init).build()
+    app = ApplicationBuilder().token(TOKEN).defaults(defaults).post_init(post_init).post_shutdown(post_shutdown).build()
 
     app.add_error_handler(error_handler)
 
@@ -143,6 +204,7 @@ if __name__ == '__main__':
     app.add_handler(CommandHandler('cancel', cancel))
     app.add_handler(CommandHandler('jobs', cmd_jobs))
     app.add_handler(CommandHandler('alert', cmd_alert))
+    app.add_handler(CommandHandler('stats', cmd_stats))
 
     # 3. PRIORITY 2: Feature Handlers (SPECIFIC regex matchers)
     app.add_handler(dashboard_handler) 
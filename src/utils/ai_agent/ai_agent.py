@@ -2,15 +2,20 @@ import os
 import logging
 import asyncio
 from typing import List, Optional
-from google import genai
-from google.genai import types
-from PIL import Image
 from utils.ai_agent.ai_prompts import build_agronomist_prompt
 
 logger = logging.getLogger(__name__)
 
 # --- CONFIGURATION ---
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+_client = None
+
+def get_client():
+    """Creates the GenAI client on first use (google.genai is slow to import and needs the .env loaded)."""
+    global _client
+    if _client is None:
+        from google import genai
+        _client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    return _client
 
 # Limit to 3 concurrent AI calls to protect CPU and API rate limits
 ai_semaphore = asyncio.Semaphore(3)
@@ -32,6 +37,7 @@ async def ask_ai(user_query: str, image_paths: Optional[List[str]] = None,
         # 2. Prepare Content
         content_parts = [full_prompt]
         if image_paths:
+            from PIL import Image
             for path in image_paths:
                 if os.path.exists(path):
                     try:
@@ -45,7 +51,7 @@ async def ask_ai(user_query: str, image_paths: Optional[List[str]] = None,
         for attempt in range(2): # Try twice
             try:
                 response = await asyncio.to_thread(
-                    client.models.generate_content,
+                    get_client().models.generate_content,
                     model=model_id,
                     contents=content_parts
                 )
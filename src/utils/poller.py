@@ -0,0 +1,83 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# --- QUEUE POLLER ---
+class QueuePoller:
+    """
+    Drains a durable queue table: claims due jobs (up to max_in_flight at once),
+    runs each in its own task, then sleeps until wake() or `poll` seconds pass
+    (retries come due on their own). Failed jobs back off exponentially from
+    retry_base and are given up after max_attempts claims.
+
+    Subclasses provide _claim(limit), _run(job), _retry(job, error, delay),
+    _give_up(job, error) and label(job). A job whose bookkeeping fails stays
+    claimed in the DB and comes back on its own (restart or lease expiry).
+    """
+    name = "queue"
+
+    def __init__(self, poll, max_in_flight, max_attempts, retry_base):
+        self.poll = poll
+        self.max_in_flight = max_in_flight
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self._wake = None
+        self._task = None
+        self._in_flight = set()
+
+    async def start(self):
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._loop(), name=self.name)
+
+    def wake(self):
+        """Call after queuing jobs to skip the poll delay."""
+        if self._wake is not None:
+            self._wake.set()
+
+    def retry_delay(self, attempts):
+        return self.retry_base * 2 ** max(attempts - 1, 0)  # 30s, 60s, 120s, ...
+
+    async def _loop(self):
+        while True:
+            self._wake.clear()
+            free = self.max_in_flight - len(self._in_flight)
+            if free > 0:
+                try:
+                    claimed = await self._claim(free)
+                except Exception as e:
+                    logger.error(f"Claiming {self.name} jobs failed: {e}")
+                    claimed = []
+                for job in claimed:
+                    task = asyncio.create_task(self._process(job))
+                    self._in_flight.add(task)
+                    task.add_done_callback(self._in_flight.discard)
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _process(self, job):
+        try:
+            await self._run(job)
+        except Exception as e:
+            logger.error(f"{self.label(job)} bookkeeping failed: {e}")
+        finally:
+            self.wake()
+
+    async def _retry_or_give_up(self, job, error):
+        if job['attempts'] >= self.max_attempts:
+            logger.error(f"❌ {self.label(job)} failed after {job['attempts']} attempts: {error}")
+            await self._give_up(job, error)
+        else:
+            delay = self.retry_delay(job['attempts'])
+            logger.warning(f"🔁 {self.label(job)} failed ({error}), retrying in {delay:.0f}s.")
+            await self._retry(job, error, delay)
+
+    async def stop(self):
+        """Stops claiming. Jobs still in flight stay claimed and come back on the next start()."""
+        tasks = [t for t in (self._task, *self._in_flight) if t is not None]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
@@ -1,12 +1,17 @@
+import os
 import logging
 import datetime
 import pytz
 from telegram.ext import ContextTypes, Application
 import database as db
 from utils.menus import MAIN_MENU_KBD
+from utils.weather import weather_cache
 
 logger = logging.getLogger(__name__)
 
+# --- CONFIGURATION ---
+PREFETCH_LEAD_MINUTES = int(os.getenv("WEATHER_PREFETCH_LEAD", "5"))  # Weather is warmed this long before each morning slot (0 = off)
+
 # --- CALLBACKS ---
 async def send_morning_alert(context: ContextTypes.DEFAULT_TYPE):
     """Checks if morning routine is done. If not, sends reminder."""
@@ -14,7 +19,7 @@ async def send_morning_alert(context: ContextTypes.DEFAULT_TYPE):
     user_id = job.user_id
     
     # Smart Check: Don't annoy if already done
-    if db.is_routine_done(user_id, 'morning'):
+    if await db.aio.is_routine_done(user_id, 'morning'):
         logger.info(f"Skipping morning alert for {user_id} (Already done)")
         return
 
@@ -33,7 +38,7 @@ async def send_evening_alert(context: ContextTypes.DEFAULT_TYPE):
     job = context.job
     user_id = job.user_id
     
-    if db.is_routine_done(user_id, 'evening'):
+    if await db.aio.is_routine_done(user_id, 'evening'):
         logger.info(f"Skipping evening alert for {user_id} (Already done)")
         return
 
@@ -47,6 +52,19 @@ async def send_evening_alert(context: ContextTypes.DEFAULT_TYPE):
     except Exception as e:
         logger.error(f"Failed to send evening alert to {user_id}: {e}")
 
+async def prefetch_weather(context: ContextTypes.DEFAULT_TYPE):
+    """Warms the weather cache for every farm whose morning alert is in this slot (job.data = "HH:MM")."""
+    job = context.job
+    locations = await db.aio.get_locations_for_photo_time(job.data)
+    if not locations:
+        # Everyone on this slot has moved to another time
+        job.schedule_removal()
+        return
+
+    # Cells that would go stale before the alert fires are fetched again
+    cells, fetched = await weather_cache.prefetch(locations, fresh_for=PREFETCH_LEAD_MINUTES * 60)
+    logger.info(f"🌦 Weather prefetch for {job.data}: {len(locations)} farms in {cells} cells, {fetched} fetched")
+
 async def send_debug_alert(context: ContextTypes.DEFAULT_TYPE):
     """For /alert command testing."""
     job = context.job
@@ -57,6 +75,21 @@ async def send_debug_alert(context: ContextTypes.DEFAULT_TYPE):
     )
 
 # --- MANAGER ---
+def schedule_weather_prefetch(application: Application, p_time_str: str, tz):
+    """One daily prefetch per morning slot, shared by every farm on it (no-op if the slot has one)."""
+    name = f"weather_prefetch_{p_time_str}"
+    if PREFETCH_LEAD_MINUTES <= 0 or application.job_queue.get_jobs_by_name(name):
+        return
+    ph_str, pm_str = p_time_str.split(':')
+    minutes = (int(ph_str) * 60 + int(pm_str) - PREFETCH_LEAD_MINUTES) % (24 * 60)
+    application.job_queue.run_daily(
+        prefetch_weather,
+        datetime.time(hour=minutes // 60, minute=minutes % 60, tzinfo=tz),
+        name=name,
+        data=p_time_str,
+        job_kwargs={"misfire_grace_time": 60, "coalesce": True}
+    )
+
 async def schedule_user_jobs(application: Application, user_id: int, p_time_str: str, v_time_str: str):
     """Removes old jobs for user and sets new ones with safety checks."""
     
@@ -97,6 +130,7 @@ async def schedule_user_jobs(application: Application, user_id: int, p_time_str:
             data="morning",
             job_kwargs={"misfire_grace_time": 300, "coalesce": True}
         )
+        schedule_weather_prefetch(application, p_time_str, tz)
         
         # Evening Job
         vh_str, vm_str = v_time_str.split(':')
@@ -124,10 +158,10 @@ async def restore_scheduled_jobs(application: Application):
         return
 
     logger.info("🔄 Restoring scheduled jobs...")
-    ids = db.get_all_user_ids()
+    ids = await db.aio.get_all_user_ids()
     count = 0
     for uid in ids:
-        user = db.get_user_profile(uid)
+        user = await db.aio.get_user_profile(uid)
         if user and user.photo_time and user.voice_time:
             await schedule_user_jobs(application, uid, user.photo_time, user.voice_time)
             count += 1
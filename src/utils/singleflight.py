@@ -0,0 +1,26 @@
+import asyncio
+
+class SingleFlight:
+    """
+    Concurrent calls for the same key share one task instead of repeating the
+    work (identical voice notes, farms in the same weather cell).
+    Lives on the bot's event loop, so no locking.
+    """
+    def __init__(self):
+        self._tasks = {}
+
+    def start(self, key, make):
+        """The task in flight for `key`, or a new one running make() (a coroutine function)."""
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(make())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return task
+
+    async def run(self, key, make):
+        # Shielded: one waiter being cancelled must not cancel the others
+        return await asyncio.shield(self.start(key, make))
+
+    def __len__(self):
+        return len(self._tasks)
@@ -0,0 +1,114 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+
+from utils.transcriber.engine import TranscriptionEngine
+from utils.transcriber.runner import JobRunner
+from utils.transcriber.cache import transcribe_cached, describe
+from utils.transcriber.lanes import INTERACTIVE, BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+WARMUP = os.getenv("TRANSCRIBE_WARMUP", "1") != "0"  # Preload the workers at startup
+
+# --- GLOBAL STATE ---
+# One engine per bot process, created on the first voice note
+_engine = None
+_engine_lock = threading.Lock()
+_runner = None
+_warmup_task = None
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = TranscriptionEngine()
+    return _engine
+
+def stats():
+    return get_engine().stats()
+
+# --- WARM-UP ---
+def start_warm_up():
+    """Loads the Whisper workers in the background (called from post_init), so the first farmer doesn't pay for it."""
+    global _warmup_task
+    if WARMUP and _warmup_task is None:
+        _warmup_task = asyncio.create_task(_warm_up(), name="transcriber-warm-up")
+    return _warmup_task
+
+async def _warm_up():
+    start = time.perf_counter()
+    engine = get_engine()
+    try:
+        results = await engine.warm_up()
+    except Exception as e:
+        logger.error(f"Transcriber warm-up failed, models will load on first use: {e}")
+        return
+    for pid, load_s, first_s in results:
+        logger.info(f"   • worker {pid}: model load {load_s:.1f}s, first clip {first_s:.2f}s")
+    logger.info(f"🔥 Transcriber ready in {time.perf_counter() - start:.1f}s ({engine.workers} workers).")
+
+def is_ready():
+    """False until the warm-up has finished: the next voice note would still wait for a model load."""
+    return _engine is not None and _engine.ready
+
+# --- BACKGROUND JOBS ---
+async def start_jobs():
+    """Starts draining the durable job queue (re-queues jobs orphaned by the last shutdown)."""
+    global _runner
+    if _runner is None:
+        _runner = JobRunner(get_engine())
+        await _runner.start()
+
+def wake_jobs():
+    if _runner is not None:
+        _runner.wake()
+
+async def stop_jobs():
+    global _runner
+    runner, _runner = _runner, None
+    if runner is not None:
+        await runner.stop()
+
+def shutdown(wait=True):
+    global _engine, _warmup_task
+    if _warmup_task is not None:
+        _warmup_task.cancel()
+        _warmup_task = None
+    with _engine_lock:
+        engine, _engine = _engine, None
+    if engine is not None:
+        engine.shutdown(wait)
+
+async def transcribe_audio(audio, user_id=None, lane=INTERACTIVE) -> str:
+    """
+    Queues a voice note on the transcription engine and waits for its text
+    (answered from the transcript cache when the same audio was seen before).
+    `audio` is a file path, bytes or a buffer (e.g. a BytesIO from download_to_memory):
+    in-memory notes are decoded straight from RAM and never touch the disk.
+    Defaults to the interactive lane: callers awaiting this have a farmer waiting.
+    Returns "" when the file is missing or empty, or transcription fails.
+    """
+    if isinstance(audio, (bytearray, memoryview)):
+        audio = bytes(audio)
+    elif hasattr(audio, "getvalue"):
+        audio = audio.getvalue()
+    elif hasattr(audio, "read"):
+        audio = audio.read()
+    if not audio or (isinstance(audio, str) and not os.path.exists(audio)):
+        return ""
+
+    engine = get_engine()
+    logger.info(f"🎙️ Queued transcription for {describe(audio)} ({engine.queue_depth} waiting)")
+    try:
+        text = (await transcribe_cached(engine, audio, lane, user_id)).text
+    except Exception as e:
+        logger.error(f"Transcription failed: {e}")
+        return ""
+
+    logger.info(f"✅ Transcription done: {text[:30]}...")
+    return text
@@ -0,0 +1,54 @@
+import os
+import asyncio
+import hashlib
+import logging
+
+import database as db
+from utils.singleflight import SingleFlight
+from utils.transcriber.engine import Transcript
+
+logger = logging.getLogger(__name__)
+
+# --- GLOBAL STATE ---
+# Keyed by sha256, so identical notes arriving together share one transcription
+_inflight = SingleFlight()
+
+def audio_sha256(file_path):
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def describe(audio):
+    """Short label for logs: the file name, or the size of an in-memory clip."""
+    if isinstance(audio, bytes):
+        return f"in-memory clip ({len(audio) // 1024} KB)"
+    return os.path.basename(audio)
+
+async def transcribe_cached(engine, audio, lane, user_id=None, on_partial=None):
+    """
+    engine.transcribe() behind the content-hash transcript cache: forwarded or
+    re-downloaded audio is answered from SQLite without entering the queue.
+    Failures are never cached, so the job queue's retries still reach Whisper.
+    `audio` is a file path or the raw bytes of the note. Returns a Transcript
+    (without compute figures when it came from the cache).
+    """
+    if isinstance(audio, bytes):
+        digest = hashlib.sha256(audio).hexdigest()
+    else:
+        digest = await asyncio.to_thread(audio_sha256, audio)
+    return await _inflight.run(digest, lambda: _lookup_or_transcribe(engine, digest, audio, lane, user_id, on_partial))
+
+async def _lookup_or_transcribe(engine, digest, audio, lane, user_id, on_partial):
+    text = await db.aio.lookup_transcript(digest)
+    if text is not None:
+        logger.info(f"♻️ Transcript cache hit for {describe(audio)}")
+        return Transcript(text)
+    transcript = await engine.transcribe(audio, lane, user_id, on_partial=on_partial)
+    try:
+        size = len(audio) if isinstance(audio, bytes) else os.path.getsize(audio)
+        await db.aio.store_transcript(digest, transcript.text, size)
+    except Exception as e:
+        logger.error(f"Saving transcript to cache failed: {e}")
+    return transcript
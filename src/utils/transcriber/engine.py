@@ -0,0 +1,504 @@
+import io
+import os
+import time
+import asyncio
+import logging
+import threading
+import functools
+import multiprocessing
+from bisect import bisect_right
+from concurrent.futures import Future, ProcessPoolExecutor, CancelledError
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.transcriber.lanes import LaneScheduler, QueuedClip, BACKGROUND, INTERACTIVE
+from utils.transcriber.probe import audio_duration
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+MODEL_SIZE = os.getenv("WHISPER_MODEL", "tiny")  # or "base" for better accuracy if CPU allows
+COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", "4"))  # Limit threads per worker
+# One worker per CPU_THREADS cores unless set explicitly (a 4-core box keeps the old single slot)
+WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", "0")) or max(1, (os.cpu_count() or 1) // CPU_THREADS)
+BATCH_MAX = int(os.getenv("TRANSCRIBE_BATCH_MAX", "8"))  # Clips per batched pass (1 = no batching)
+BATCH_WINDOW_MS = float(os.getenv("TRANSCRIBE_BATCH_MS", "150"))  # How long a background clip waits for company
+VAD_FILTER = os.getenv("WHISPER_VAD", "1") != "0"  # Cut silence before inference
+VAD_MIN_SILENCE_MS = int(os.getenv("WHISPER_VAD_MIN_SILENCE_MS", "500"))  # Shorter pauses are kept
+# Recordings with more speech than this are split on silences and their chunks spread over the workers (0 = never)
+SPLIT_SECONDS = float(os.getenv("TRANSCRIBE_SPLIT_SECONDS", "60"))
+CHUNK_SECONDS = float(os.getenv("TRANSCRIBE_CHUNK_SECONDS", "30"))  # Speech per chunk; <= 30 keeps chunks batchable
+
+# --- RESULTS ---
+class Transcript:
+    """A clip's text plus what it cost: seconds of audio, of speech left after VAD, and of compute."""
+    __slots__ = ("text", "audio_seconds", "speech_seconds", "compute_seconds")
+
+    def __init__(self, text, audio_seconds=None, speech_seconds=None, compute_seconds=None):
+        self.text = text
+        self.audio_seconds = audio_seconds
+        self.speech_seconds = speech_seconds
+        self.compute_seconds = compute_seconds  # None when nothing ran (e.g. a cache hit)
+
+    @property
+    def rtf(self):
+        """Real-time factor: compute seconds per second of audio (lower is better)."""
+        return self.compute_seconds / self.audio_seconds if self.audio_seconds and self.compute_seconds is not None else None
+
+class Chunk:
+    """A slice of a long recording, already decoded and trimmed to speech; queued like any other clip."""
+    __slots__ = ("samples", "audio_seconds")
+
+    def __init__(self, samples, audio_seconds):
+        self.samples = samples
+        self.audio_seconds = audio_seconds  # Share of the original recording, silences included
+
+class Split:
+    """A worker's answer for a recording too long for one pass: its chunks, in order."""
+    __slots__ = ("chunks", "prep_seconds")
+
+    def __init__(self, chunks, prep_seconds):
+        self.chunks = chunks
+        self.prep_seconds = prep_seconds
+
+# --- WORKER PROCESS ---
+# Everything in this section runs inside the pool's worker processes.
+_model_instance = None
+_model_load_seconds = 0.0
+_batched_instance = None
+_model_config = (MODEL_SIZE, COMPUTE_TYPE, CPU_THREADS)
+
+def _init_worker(model_size, compute_type, cpu_threads):
+    """Pool initializer: each worker loads its own model once, before taking jobs."""
+    global _model_config
+    _model_config = (model_size, compute_type, cpu_threads)
+    get_model()
+
+def get_model():
+    """Lazy-loads the model only when first needed."""
+    global _model_instance, _model_load_seconds
+    if _model_instance is None:
+        start = time.perf_counter()
+        # Heavy import (ctranslate2, numpy): only paid by processes that actually transcribe
+        from faster_whisper import WhisperModel
+        model_size, compute_type, cpu_threads = _model_config
+        logger.info(f"⬇️ Loading Whisper Model ({model_size}, {compute_type}, {cpu_threads} threads) in pid {os.getpid()}...")
+        _model_instance = WhisperModel(model_size, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+        _model_load_seconds = time.perf_counter() - start
+    return _model_instance
+
+def _warm_up():
+    """Runs one second of silence through the model so the first real clip skips the cold-start costs."""
+    import numpy as np
+    model = get_model()
+    start = time.perf_counter()
+    silence = np.zeros(model.feature_extractor.sampling_rate, dtype=np.float32)
+    _trim_silence(silence, model.feature_extractor.sampling_rate)  # Loads the VAD model too
+    segments, _ = model.transcribe(silence, beam_size=1)
+    list(segments)  # Segments are lazy: decoding only happens while iterating
+    return os.getpid(), _model_load_seconds, time.perf_counter() - start
+
+def get_batched_pipeline():
+    global _batched_instance
+    if _batched_instance is None:
+        from faster_whisper import BatchedInferencePipeline
+        _batched_instance = BatchedInferencePipeline(model=get_model())
+    return _batched_instance
+
+def _as_input(audio):
+    """Clips arrive as a path, raw bytes (voice notes kept in memory) or decoded samples."""
+    return io.BytesIO(audio) if isinstance(audio, bytes) else audio
+
+def _speech_ranges(audio, rate):
+    """
+    Voiced parts as sample ranges, none longer than CHUNK_SECONDS (Silero VAD, bundled
+    with faster-whisper), so silence never reaches the model. Without VAD: fixed slices.
+    """
+    if not VAD_FILTER:
+        step = int(CHUNK_SECONDS * rate)
+        return [{"start": s, "end": min(s + step, len(audio))} for s in range(0, len(audio), step)]
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+    options = VadOptions(min_silence_duration_ms=VAD_MIN_SILENCE_MS, max_speech_duration_s=CHUNK_SECONDS)
+    return get_speech_timestamps(audio, options, sampling_rate=rate)
+
+def _join(audio, ranges):
+    import numpy as np
+    if not ranges:
+        return audio[:0]
+    return np.concatenate([audio[r["start"]:r["end"]] for r in ranges])
+
+def _trim_silence(audio, rate):
+    return _join(audio, _speech_ranges(audio, rate))
+
+def _split(audio, ranges, rate):
+    """Groups speech ranges into chunks of at most CHUNK_SECONDS of speech, cutting only in silences."""
+    limit = CHUNK_SECONDS * rate
+    chunks, group, speech, covered = [], [], 0, 0
+    for r in ranges + [None]:
+        if group and (r is None or speech + r["end"] - r["start"] > limit):
+            cut = len(audio) if r is None else (group[-1]["end"] + r["start"]) // 2  # Middle of the silence
+            chunks.append(Chunk(_join(audio, group), (cut - covered) / rate))
+            group, speech, covered = [], 0, cut
+        if r is not None:
+            group.append(r)
+            speech += r["end"] - r["start"]
+    return chunks
+
+def _guarded(fn, *args):
+    try:
+        return fn(*args), None
+    except Exception as e:
+        return None, e
+
+def _transcribe_clips(clips, split_seconds=0):
+    """
+    Decodes, trims and transcribes one or more clips. Returns a (Transcript, error)
+    pair per clip, so one unreadable file doesn't fail its neighbours.
+    Speech that fits a Whisper window (30s) shares one batched pass; longer speech
+    runs on its own. A batch's compute time is split by each clip's speech length.
+    With split_seconds, a recording with more speech than that comes back as a
+    Split instead, for the engine to queue its chunks.
+    """
+    from faster_whisper import decode_audio
+    model = get_model()
+    rate = model.feature_extractor.sampling_rate
+    max_samples = model.feature_extractor.chunk_length * rate
+    results = [None] * len(clips)
+    batch = []  # (index, speech, audio_seconds, prep_seconds)
+    for i, clip in enumerate(clips):
+        if isinstance(clip, Chunk):
+            if len(clip.samples) > max_samples:
+                results[i] = _guarded(_transcribe_one, clip.samples, rate, clip.audio_seconds, 0.0)
+            else:
+                batch.append((i, clip.samples, clip.audio_seconds, 0.0))
+            continue
+        start = time.perf_counter()
+        audio, error = _guarded(decode_audio, _as_input(clip), rate)
+        if error is None:
+            ranges, error = _guarded(_speech_ranges, audio, rate)
+        if error is not None:
+            results[i] = (None, error)
+            continue
+        audio_s = len(audio) / rate
+        if split_seconds and sum(r["end"] - r["start"] for r in ranges) > split_seconds * rate:
+            chunks = _split(audio, ranges, rate)
+            results[i] = (Split(chunks, time.perf_counter() - start), None)
+            continue
+        speech = _join(audio, ranges)
+        prep_s = time.perf_counter() - start
+        if len(speech) == 0:
+            results[i] = (Transcript("", audio_s, 0.0, prep_s), None)
+        elif len(speech) > max_samples:
+            results[i] = _guarded(_transcribe_one, speech, rate, audio_s, prep_s)
+        else:
+            batch.append((i, speech, audio_s, prep_s))
+
+    if len(batch) == 1:
+        i, speech, audio_s, prep_s = batch[0]
+        results[i] = _guarded(_transcribe_one, speech, rate, audio_s, prep_s)
+    elif batch:
+        start = time.perf_counter()
+        try:
+            texts = _batched_texts([speech for _, speech, _, _ in batch], rate)
+        except Exception as e:
+            logger.error(f"Batched transcription failed, falling back to one clip at a time: {e}")
+            for i, speech, audio_s, prep_s in batch:
+                results[i] = _guarded(_transcribe_one, speech, rate, audio_s, prep_s)
+        else:
+            elapsed = time.perf_counter() - start
+            total = sum(len(speech) for _, speech, _, _ in batch)
+            for (i, speech, audio_s, prep_s), text in zip(batch, texts):
+                share = elapsed * len(speech) / total
+                results[i] = (Transcript(text, audio_s, len(speech) / rate, prep_s + share), None)
+    return results
+
+def _transcribe_one(speech, rate, audio_s, prep_s):
+    start = time.perf_counter()
+    segments, _ = get_model().transcribe(speech, beam_size=1)
+    text = " ".join([segment.text for segment in segments]).strip()
+    return Transcript(text, audio_s, len(speech) / rate, prep_s + time.perf_counter() - start)
+
+def _batched_texts(audios, rate):
+    """Lays the clips end to end, marks each one as its own chunk and maps segments back by start time."""
+    import numpy as np
+    starts, pos = [], 0
+    for audio in audios:
+        starts.append(pos / rate)
+        pos += len(audio)
+    clips = [{"start": start, "end": start + len(audio) / rate} for start, audio in zip(starts, audios)]
+    segments, _ = get_batched_pipeline().transcribe(
+        np.concatenate(audios), clip_timestamps=clips, batch_size=len(audios), beam_size=1,
+    )
+    texts = [[] for _ in audios]
+    for segment in segments:
+        texts[max(0, bisect_right(starts, segment.start + 0.01) - 1)].append(segment.text)
+    return [" ".join(t).strip() for t in texts]
+
+# --- ENGINE ---
+class TranscriptionEngine:
+    """
+    Process pool of Whisper workers, each with its own preloaded model.
+    Jobs wait in the engine's own lane scheduler and at most `workers` are handed
+    to the pool at a time, so queue depth is exact and the scheduling order stays ours.
+
+    With batch_max > 1 a worker takes up to batch_max queued clips of one user in a
+    single batched pass. Background clips wait up to batch_window for others to
+    arrive; interactive clips never wait, they just take whatever is already queued.
+
+    Recordings with more than split_seconds of speech come back from the worker as
+    chunks cut on silences. The chunks go through the queue like any other clip, so
+    free workers share them, and the recording's future resolves once all are back.
+    """
+    def __init__(self, workers=WORKERS, model_size=MODEL_SIZE, compute_type=COMPUTE_TYPE, cpu_threads=CPU_THREADS,
+                 batch_max=BATCH_MAX, batch_window=BATCH_WINDOW_MS / 1000, split_seconds=SPLIT_SECONDS):
+        self.workers = workers
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.batch_max = max(1, batch_max)
+        self.batch_window = batch_window
+        self.split_seconds = split_seconds
+        self._pool = None
+        self._warm_pool = None
+        self._queue = LaneScheduler()
+        self._running = 0
+        self._timer = None
+        self._lock = threading.RLock()
+        self.completed = 0
+        self.failed = 0
+        self.batches = 0
+        self.batched_clips = 0
+        self.splits = 0
+        self.audio_seconds = 0.0
+        self.speech_seconds = 0.0
+        self.compute_seconds = 0.0
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            # spawn: the bot process has live threads (DB, shadow sync), which fork would copy mid-lock
+            self._pool = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker, initargs=(self.model_size, self.compute_type, self.cpu_threads),
+            )
+            logger.info(f"🎛️ Transcription pool started: {self.workers} workers x {self.cpu_threads} threads ({self.model_size}).")
+        return self._pool
+
+    # -- Submit / await --
+    def submit(self, audio, lane=BACKGROUND, user_id=None, duration=None, on_partial=None):
+        """
+        Queues a clip (file path or bytes) from any thread; returns a Future with its
+        Transcript (or the worker's exception). The duration is probed from the container
+        when not given, for shortest-job-first scheduling. on_partial(text) is called
+        from an engine thread as a long recording's leading chunks finish.
+        """
+        if duration is None:
+            duration = audio_duration(audio)
+        fut = Future()
+        with self._lock:
+            self._queue.push(QueuedClip(audio, fut, lane, user_id, duration, on_partial))
+        self._dispatch()
+        return fut
+
+    async def transcribe(self, audio, lane=BACKGROUND, user_id=None, duration=None, on_partial=None):
+        return await asyncio.wrap_future(self.submit(audio, lane, user_id, duration, on_partial))
+
+    # -- Dispatch --
+    def _dispatch(self):
+        while True:
+            with self._lock:
+                if self._running >= self.workers:
+                    return
+                clips = [c for c in self._next_batch() if c.fut.set_running_or_notify_cancel()]
+                if not clips:
+                    if len(self._queue) and self._timer is None:
+                        continue  # Everything popped was cancelled
+                    return
+                self._running += 1
+                pool = self._ensure_pool()
+            try:
+                pool_fut = pool.submit(_transcribe_clips, [c.payload for c in clips], self.split_seconds)
+            except Exception as e:
+                self._finish(clips, pool, error=e, redispatch=False)
+                continue
+            pool_fut.add_done_callback(functools.partial(self._on_done, clips, pool))
+
+    def _next_batch(self):
+        """Pops the clips for the next worker call, or nothing while a background batch is still filling up."""
+        head = self._queue.peek()
+        if head is None:
+            return []
+        if self.batch_max > 1 and head.lane != INTERACTIVE:
+            wait = head.enqueued_at + self.batch_window - time.monotonic()
+            if wait > 0 and self._queue.batchable(head) < self.batch_max:
+                self._arm_timer(wait)
+                return []
+        return self._queue.pop_batch(self.batch_max)
+
+    def _arm_timer(self, delay):
+        if self._timer is None:
+            self._timer = threading.Timer(delay, self._on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+        self._dispatch()
+
+    def _on_done(self, clips, pool, pool_fut):
+        try:
+            result = pool_fut.result()
+        except BaseException as e:
+            self._finish(clips, pool, error=e)
+            return
+        self._finish(clips, pool, results=result)
+
+    def _finish(self, clips, pool, results=None, error=None, redispatch=True):
+        if results is None:
+            results = [(None, error)] * len(clips)
+        with self._lock:
+            self._running -= 1
+            if len(clips) > 1:
+                self.batches += 1
+                self.batched_clips += len(clips)
+            for transcript, clip_error in results:
+                if isinstance(transcript, Split):
+                    self.splits += 1
+                elif clip_error is None:
+                    self.completed += 1
+                    self.audio_seconds += transcript.audio_seconds
+                    self.speech_seconds += transcript.speech_seconds
+                    self.compute_seconds += transcript.compute_seconds
+                else:
+                    self.failed += 1
+            if isinstance(error, BrokenProcessPool) and self._pool is pool:
+                # A worker died (e.g. OOM): drop the pool, the next dispatch starts a fresh one
+                logger.error("💥 Transcription worker crashed, restarting pool.")
+                self._pool = None
+                pool.shutdown(wait=False, cancel_futures=True)
+        for clip, (transcript, clip_error) in zip(clips, results):
+            if isinstance(transcript, Split):
+                self._fan_out(clip, transcript)
+            elif clip_error is None:
+                clip.fut.set_result(transcript)
+            else:
+                clip.fut.set_exception(clip_error)
+        if redispatch:
+            self._dispatch()
+
+    def _fan_out(self, parent, split):
+        """Queues a long recording's chunks behind the parent's future (dispatched by the caller)."""
+        job = _ChunkedJob(parent, split)
+        logger.info(f"✂️ Split a {sum(c.audio_seconds for c in split.chunks):.0f}s recording into {len(split.chunks)} chunks.")
+        with self._lock:
+            for i, chunk in enumerate(split.chunks):
+                fut = Future()
+                job.futs.append(fut)
+                fut.add_done_callback(functools.partial(job.collect, i))
+                self._queue.push(QueuedClip(chunk, fut, parent.lane, parent.user_id, chunk.audio_seconds))
+
+    # -- Warm-up --
+    async def warm_up(self):
+        """
+        Starts the pool and sends one synthetic clip per worker. Spawning is lazy, so
+        each concurrent submit brings up another worker (and its initializer loads the model).
+        Returns (pid, model_load_s, first_clip_s) per warm-up clip.
+        """
+        with self._lock:
+            pool = self._ensure_pool()
+        results = await asyncio.gather(*(asyncio.wrap_future(pool.submit(_warm_up)) for _ in range(self.workers)))
+        with self._lock:
+            self._warm_pool = pool
+        return results
+
+    @property
+    def ready(self):
+        """True once the current pool is warmed up (a crashed pool's replacement starts cold)."""
+        return self._pool is not None and self._pool is self._warm_pool
+
+    # -- Introspection / lifecycle --
+    @property
+    def queue_depth(self):
+        return len(self._queue)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "ready": self.ready,
+                "queued": len(self._queue),
+                "running": self._running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "batches": self.batches,
+                "avg_batch": round(self.batched_clips / self.batches, 1) if self.batches else 0,
+                "splits": self.splits,
+                "audio_s": round(self.audio_seconds, 1),
+                "speech_s": round(self.speech_seconds, 1),
+                "compute_s": round(self.compute_seconds, 1),
+                "rtf": round(self.compute_seconds / self.audio_seconds, 3) if self.audio_seconds else 0,
+                "lanes": self._queue.stats(),
+            }
+
+    def shutdown(self, wait=True):
+        """Cancels queued clips and stops the workers (running clips finish when wait=True)."""
+        with self._lock:
+            pending = self._queue.drain()
+            pool, self._pool = self._pool, None
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        for clip in pending:
+            clip.fut.cancel()
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+# --- CHUNKED RECORDINGS ---
+class _ChunkedJob:
+    """Stitches a split recording back together in order, reporting the text so far as leading chunks finish."""
+    def __init__(self, parent, split):
+        self.parent = parent
+        self.prep_seconds = split.prep_seconds
+        self.results = [None] * len(split.chunks)
+        self.futs = []
+        self.published = 0  # Leading chunks already reported through on_partial
+        self.finished = False
+        self.lock = threading.Lock()
+
+    def collect(self, index, fut):
+        with self.lock:
+            if self.finished:
+                return
+            error = CancelledError() if fut.cancelled() else fut.exception()
+            if error is None:
+                self.results[index] = fut.result()
+                grew = False
+                while self.published < len(self.results) and self.results[self.published] is not None:
+                    self.published += 1
+                    grew = True
+                self.finished = self.published == len(self.results)
+            else:
+                self.finished = True
+            partial = self._text(self.results[:self.published]) if error is None and grew and not self.finished else None
+
+        if error is not None:
+            for f in self.futs:
+                f.cancel()  # Chunks still queued are skipped, the retry starts over
+            self.parent.fut.set_exception(error)
+        elif partial is not None:
+            if self.parent.on_partial is not None:
+                try:
+                    self.parent.on_partial(partial)
+                except Exception as e:
+                    logger.error(f"Partial transcript callback failed: {e}")
+        elif self.finished:
+            self.parent.fut.set_result(Transcript(
+                self._text(self.results),
+                sum(t.audio_seconds for t in self.results),
+                sum(t.speech_seconds for t in self.results),
+                self.prep_seconds + sum(t.compute_seconds for t in self.results),
+            ))
+
+    @staticmethod
+    def _text(transcripts):
+        return " ".join(t.text for t in transcripts if t.text)
@@ -0,0 +1,164 @@
+import os
+import time
+import heapq
+import itertools
+from collections import deque, OrderedDict
+
+# --- CONFIGURATION ---
+AGING = float(os.getenv("TRANSCRIBE_AGING", "5"))  # Seconds of audio a clip "loses" per second it waits
+UNKNOWN_DURATION = 30.0  # Assumed length when the probe can't read the container
+
+# --- CONSTANTS ---
+INTERACTIVE = "interactive"  # A farmer is waiting on the answer (AI voice question, feedback note)
+BACKGROUND = "background"    # Diary notes transcribed after the entry is saved
+LANES = (INTERACTIVE, BACKGROUND)
+
+# --- METRICS ---
+class WaitStats:
+    """Queue-wait times for one lane: totals since start plus a recent window for percentiles."""
+    def __init__(self, window=500):
+        self._recent = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self._recent.append(seconds)
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def snapshot(self):
+        recent = sorted(self._recent)
+        def pct(p):
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))] * 1000) if recent else 0
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000) if self.count else 0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": round(self.max * 1000),
+        }
+
+# --- SCHEDULER ---
+class QueuedClip:
+    __slots__ = ("payload", "fut", "lane", "user_id", "duration", "on_partial", "enqueued_at")
+
+    def __init__(self, payload, fut, lane, user_id, duration=None, on_partial=None):
+        self.payload = payload
+        self.fut = fut
+        self.lane = lane
+        self.user_id = user_id
+        self.duration = duration  # Seconds of audio, None when the probe couldn't tell
+        self.on_partial = on_partial  # Called with the text so far while a long recording is in progress
+        self.enqueued_at = time.monotonic()
+
+class LaneScheduler:
+    """
+    Decides which queued clip goes to the next free worker.
+    Interactive clips always jump ahead of queued background work. Background
+    clips are served round-robin per user, so one farmer's 20 notes can't starve
+    everyone else. Not thread-safe on its own: the engine holds its lock around it.
+
+    Within a lane (and within one user's background clips) the shortest clip goes
+    first, so a quick spot note doesn't wait behind a 5-minute summary. Each second
+    of waiting counts as `aging` seconds less audio, so long clips still get their
+    turn: priority = duration + aging * enqueued_at never changes once queued.
+    """
+    def __init__(self, aging=AGING):
+        self.aging = aging
+        self._seq = itertools.count()  # Ties go to the older clip
+        self._interactive = []  # heap of (priority, seq, clip)
+        self._background = OrderedDict()  # user_id -> heap of clips, in round-robin order
+        self._sizes = {lane: 0 for lane in LANES}
+        self.waits = {lane: WaitStats() for lane in LANES}
+
+    def push(self, clip):
+        duration = clip.duration if clip.duration is not None else UNKNOWN_DURATION
+        entry = (duration + self.aging * clip.enqueued_at, next(self._seq), clip)
+        if clip.lane == INTERACTIVE:
+            heapq.heappush(self._interactive, entry)
+        else:
+            heapq.heappush(self._background.setdefault(clip.user_id, []), entry)
+        self._sizes[clip.lane] += 1
+
+    def pop(self):
+        """Next clip to run (recording how long it waited), or None when empty."""
+        if self._interactive:
+            clip = heapq.heappop(self._interactive)[2]
+        elif self._background:
+            user_id, clips = next(iter(self._background.items()))
+            clip = heapq.heappop(clips)[2]
+            if clips:
+                self._background.move_to_end(user_id)  # This user's next clip goes to the back of the line
+            else:
+                del self._background[user_id]
+        else:
+            return None
+        self._taken(clip)
+        return clip
+
+    def peek(self):
+        """The clip pop() would return next, without removing it."""
+        if self._interactive:
+            return self._interactive[0][2]
+        if self._background:
+            return next(iter(self._background.values()))[0][2]
+        return None
+
+    def batchable(self, clip):
+        """How many queued clips could share a batch with `clip` (itself included)."""
+        if clip.lane == INTERACTIVE:
+            return sum(1 for _, _, c in self._interactive if c.user_id == clip.user_id)
+        return len(self._background.get(clip.user_id, ()))
+
+    def pop_batch(self, limit):
+        """
+        pop() plus up to limit-1 more clips from the same lane and user, shortest first.
+        Batches stay per user because Whisper detects one language per batch.
+        """
+        first = self.pop()
+        if first is None:
+            return []
+        batch = [first]
+        if first.lane == INTERACTIVE:
+            chosen = heapq.nsmallest(limit - 1, (e for e in self._interactive if e[2].user_id == first.user_id))
+            if chosen:
+                seqs = {e[1] for e in chosen}
+                self._interactive = [e for e in self._interactive if e[1] not in seqs]
+                heapq.heapify(self._interactive)
+                for _, _, clip in chosen:
+                    self._taken(clip)
+                    batch.append(clip)
+        else:
+            clips = self._background.get(first.user_id)
+            while clips and len(batch) < limit:
+                clip = heapq.heappop(clips)[2]
+                self._taken(clip)
+                batch.append(clip)
+            if clips is not None and not clips:
+                del self._background[first.user_id]
+        return batch
+
+    def drain(self):
+        """Removes and returns every queued clip."""
+        clips = [e[2] for e in self._interactive]
+        for user_clips in self._background.values():
+            clips.extend(e[2] for e in user_clips)
+        self._interactive = []
+        self._background.clear()
+        self._sizes = {lane: 0 for lane in LANES}
+        return clips
+
+    def _taken(self, clip):
+        self._sizes[clip.lane] -= 1
+        self.waits[clip.lane].add(time.monotonic() - clip.enqueued_at)
+
+    def __len__(self):
+        return sum(self._sizes.values())
+
+    def depth(self, lane):
+        return self._sizes[lane]
+
+    def stats(self):
+        return {lane: {"queued": self._sizes[lane], **self.waits[lane].snapshot()} for lane in LANES}
@@ -0,0 +1,65 @@
+import os
+import struct
+
+# --- CONSTANTS ---
+HEAD_BYTES = 4096    # Container headers (OpusHead / Vorbis id / WAV fmt) sit at the very start
+TAIL_BYTES = 65536   # An Ogg page is at most ~64 KB, so the last page header is in here
+OPUS_RATE = 48000    # Opus granule positions always count 48 kHz samples
+
+def audio_duration(audio):
+    """
+    Clip length in seconds from the container headers, without decoding, or None
+    when the format isn't recognised. Handles Ogg Opus/Vorbis (Telegram voice notes) and WAV.
+    `audio` is a file path or the raw bytes of the clip.
+    """
+    try:
+        if isinstance(audio, bytes):
+            size = len(audio)
+            head, tail = audio[:HEAD_BYTES], audio[-TAIL_BYTES:]
+        else:
+            with open(audio, "rb") as f:
+                head = f.read(HEAD_BYTES)
+                size = f.seek(0, os.SEEK_END)
+                f.seek(max(0, size - TAIL_BYTES))
+                tail = f.read()
+    except OSError:
+        return None
+
+    try:
+        if head.startswith(b"OggS"):
+            return _ogg_duration(head, tail)
+        if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+            return _wav_duration(head, size)
+    except struct.error:
+        pass  # Truncated headers
+    return None
+
+def _ogg_duration(head, tail):
+    """The last page's granule position is the total sample count."""
+    pos = len(tail)
+    while True:
+        pos = tail.rfind(b"OggS", 0, pos)
+        if pos < 0 or pos + 14 > len(tail):
+            return None
+        granule = struct.unpack_from("<q", tail, pos + 6)[0]
+        if tail[pos + 4] == 0 and granule >= 0:  # Version 0, and a page that completes a packet
+            break
+
+    i = head.find(b"OpusHead")
+    if i >= 0:
+        pre_skip = struct.unpack_from("<H", head, i + 10)[0]
+        return max(0, granule - pre_skip) / OPUS_RATE
+    i = head.find(b"\x01vorbis")
+    if i >= 0:
+        rate = struct.unpack_from("<I", head, i + 12)[0]
+        return granule / rate if rate else None
+    return None
+
+def _wav_duration(head, size):
+    fmt = head.find(b"fmt ")
+    data = head.find(b"data")
+    if fmt < 0 or data < 0:
+        return None
+    byte_rate = struct.unpack_from("<I", head, fmt + 16)[0]
+    data_size = min(struct.unpack_from("<I", head, data + 4)[0], size - data - 8)
+    return data_size / byte_rate if byte_rate else None
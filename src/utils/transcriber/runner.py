@@ -0,0 +1,68 @@
+import os
+import logging
+import functools
+
+import database as db
+from utils.poller import QueuePoller
+from utils.transcriber.lanes import BACKGROUND
+from utils.transcriber.cache import transcribe_cached
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+POLL_SECONDS = float(os.getenv("TRANSCRIBE_POLL_SECONDS", "5"))  # Fallback check for due retries
+
+# --- JOB RUNNER ---
+class JobRunner(QueuePoller):
+    """
+    Feeds the durable transcription_jobs queue into the engine.
+    Jobs are claimed in the DB (state 'running') before they reach a worker, so a
+    crash or deploy leaves them as orphans that the next start() re-queues.
+    """
+    name = "transcription-jobs"
+
+    def __init__(self, engine, poll=POLL_SECONDS, max_in_flight=None):
+        # Keep every worker busy with a full batch plus one more batch waiting in the engine queue
+        super().__init__(poll, max_in_flight or engine.workers * (engine.batch_max + 1),
+                         db.jobs.MAX_ATTEMPTS, db.jobs.RETRY_BASE_SECONDS)
+        self.engine = engine
+
+    async def start(self):
+        requeued = await db.aio.requeue_orphan_jobs()
+        if requeued:
+            logger.info(f"♻️ Re-queued {requeued} transcription jobs interrupted by the last shutdown.")
+        await super().start()
+
+    @staticmethod
+    def label(job):
+        return f"Transcription job {job['id']}"
+
+    async def _claim(self, limit):
+        return await db.aio.claim_jobs(limit)
+
+    async def _run(self, job):
+        if not os.path.exists(job['file_path']):
+            await db.aio.fail_job(job['id'], job['log_id'], "audio file missing")
+            return
+        try:
+            result = await transcribe_cached(self.engine, job['file_path'], BACKGROUND, job['user_id'],
+                                             on_partial=functools.partial(self._partial, job))
+        except Exception as e:
+            await self._retry_or_give_up(job, e)
+            return
+        if result.rtf is not None:
+            logger.info(f"📝 Job {job['id']}: {result.audio_seconds:.1f}s audio ({result.speech_seconds:.1f}s speech) "
+                        f"in {result.compute_seconds:.1f}s, RTF {result.rtf:.2f}")
+        await db.aio.complete_job(job['id'], job['log_id'], result.text,
+                                  result.audio_seconds, result.compute_seconds)
+
+    @staticmethod
+    def _partial(job, text):
+        """Long recordings: history shows the leading chunks' text while the rest is still running."""
+        db.writes.submit(*db.jobs._op_partial(job['id'], job['log_id'], text))
+
+    async def _retry(self, job, error, delay):
+        await db.aio.retry_job(job['id'], str(error), delay)
+
+    async def _give_up(self, job, error):
+        await db.aio.fail_job(job['id'], job['log_id'], str(error))
@@ -0,0 +1,47 @@
+import logging
+
+from utils.weather.cache import weather_cache
+from utils.weather.breaker import WeatherUnavailable
+from utils.weather.provider import open_session, close_session
+from utils.weather.enricher import WeatherEnricher
+
+logger = logging.getLogger(__name__)
+
+# --- GLOBAL STATE ---
+_enricher = None
+
+async def get_weather_data(lat, lon):
+    """Weather for a location via the grid cache; None when it can't be had (no location, API down)."""
+    if lat is None or lon is None:
+        return None
+    try:
+        data = await weather_cache.get(lat, lon)
+    except WeatherUnavailable:
+        # Outage already logged when the circuit opened; no need to repeat it per request
+        return None
+    except Exception as e:
+        logger.error(f"Weather Fetch Error: {e}")
+        return None
+    # Copy: the cached dict is shared by every entry in the cell
+    return dict(data)
+
+def stats():
+    return weather_cache.stats()
+
+# --- BACKGROUND ENRICHMENT ---
+async def start_enrichment():
+    """Starts filling in the weather of entries saved with weather_at=(lat, lon)."""
+    global _enricher
+    if _enricher is None:
+        _enricher = WeatherEnricher()
+        await _enricher.start()
+
+def wake_enrichment():
+    if _enricher is not None:
+        _enricher.wake()
+
+async def stop_enrichment():
+    global _enricher
+    enricher, _enricher = _enricher, None
+    if enricher is not None:
+        await enricher.stop()
@@ -0,0 +1,71 @@
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+BREAKER_FAILURES = int(os.getenv("WEATHER_BREAKER_FAILURES", "5"))       # Consecutive failures that open the circuit
+BREAKER_COOLDOWN = float(os.getenv("WEATHER_BREAKER_COOLDOWN", "60"))    # Seconds open before a single probe is let through
+
+# --- CONSTANTS ---
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+class WeatherUnavailable(Exception):
+    """Raised without calling the API: the circuit is open or this cell failed moments ago."""
+
+# --- CIRCUIT BREAKER ---
+class CircuitBreaker:
+    """
+    Closed: calls go through and consecutive failures are counted.
+    Open: calls are refused at once until the cooldown has passed.
+    Half-open: one probe goes through; success closes the circuit, failure
+    re-opens it. A probe that never reports back (cancelled) just lets the next
+    one through after another cooldown.
+    Lives on the bot's event loop, so no locking.
+    """
+    def __init__(self, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.consecutive = 0
+        self._opened_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+
+    def allow(self):
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if now - self._opened_at < self.cooldown:
+            self.rejected += 1
+            return False
+        # Cooldown over: this caller is the probe, the rest wait for another cooldown
+        self.state = HALF_OPEN
+        self._opened_at = now
+        return True
+
+    def record_success(self):
+        if self.state != CLOSED:
+            logger.info("✅ Weather API is back, circuit closed.")
+        self.state = CLOSED
+        self.consecutive = 0
+
+    def record_failure(self):
+        self.consecutive += 1
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.consecutive >= self.failures):
+            if self.state == CLOSED:
+                logger.warning(f"⚡ Weather API failed {self.consecutive} times in a row, circuit open for {self.cooldown:.0f}s.")
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+            self.trips += 1
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,160 @@
+import os
+import time
+import asyncio
+import logging
+import functools
+from collections import OrderedDict
+
+import database as db
+from utils.singleflight import SingleFlight
+from utils.weather.provider import fetch_weather
+from utils.weather.breaker import CircuitBreaker, WeatherUnavailable
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+WEATHER_GRID_DEG = float(os.getenv("WEATHER_GRID_DEG", "0.05"))         # Cell size (~5 km); farms in one cell share a reading
+WEATHER_TTL_SECONDS = int(os.getenv("WEATHER_TTL_SECONDS", "600"))      # Readings older than this are fetched again
+WEATHER_CACHE_SIZE = int(os.getenv("WEATHER_CACHE_SIZE", "2048"))       # Cells kept in memory
+WEATHER_SQLITE_CACHE = os.getenv("WEATHER_SQLITE_CACHE", "1") == "1"    # Second tier that survives restarts
+WEATHER_PREFETCH_RATE = float(os.getenv("WEATHER_PREFETCH_RATE", "1"))  # API calls per second when warming the cache
+WEATHER_NEGATIVE_TTL = float(os.getenv("WEATHER_NEGATIVE_TTL", "60"))   # A cell whose fetch failed isn't retried for this long
+
+# --- WEATHER CACHE ---
+class WeatherCache:
+    """
+    TTL cache of weather readings keyed by lat/lon grid cell, so every entry
+    from the same farm (and every farm in the same cell) within the TTL costs
+    one API call. Memory first, then SQLite, then the API; concurrent misses
+    for one cell share a single fetch.
+    During an outage callers fail fast with WeatherUnavailable: a failed cell
+    is remembered for negative_ttl, and the circuit breaker refuses all
+    fetches once the API keeps failing.
+    Lives on the bot's event loop, so no locking.
+    """
+    def __init__(self, grid=WEATHER_GRID_DEG, ttl=WEATHER_TTL_SECONDS, maxsize=WEATHER_CACHE_SIZE,
+                 sqlite=WEATHER_SQLITE_CACHE, fetch=fetch_weather, negative_ttl=WEATHER_NEGATIVE_TTL, breaker=None):
+        self.grid = grid
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.sqlite = sqlite
+        self.negative_ttl = negative_ttl
+        self.breaker = breaker or CircuitBreaker()
+        self._fetch = fetch
+        self._data = OrderedDict()  # cell -> (fetched_at, data)
+        self._failed = {}           # cell -> when its last fetch failed
+        self._inflight = SingleFlight()  # Keyed by cell
+        self.memory_hits = 0
+        self.sqlite_hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self.errors = 0
+        self.negative_hits = 0
+
+    def cell(self, lat, lon):
+        return round(lat / self.grid), round(lon / self.grid)
+
+    def _centre(self, cell):
+        # Fetched at the cell centre, so the reading doesn't depend on which farm asked first
+        return round(cell[0] * self.grid, 5), round(cell[1] * self.grid, 5)
+
+    async def get(self, lat, lon):
+        """Weather for the cell containing (lat, lon). Raises when it has to fetch and the fetch fails."""
+        cell = self.cell(lat, lon)
+        entry = self._data.get(cell)
+        if entry is not None and time.time() - entry[0] < self.ttl:
+            self._data.move_to_end(cell)
+            self.memory_hits += 1
+            return entry[1]
+
+        return await self._inflight.run(cell, functools.partial(self._load, cell))
+
+    async def prefetch(self, locations, fresh_for=0, per_second=WEATHER_PREFETCH_RATE):
+        """
+        Warms the cells covering `locations` (lat, lon pairs), one fetch per cell,
+        skipping cells that will still be fresh `fresh_for` seconds from now.
+        Fetches start at most `per_second` a second to stay inside the API quota.
+        Returns (cells, fetched); failures are counted, not raised.
+        """
+        cells = {self.cell(lat, lon) for lat, lon in locations}
+        now = time.time()
+        stale = [c for c in cells if c not in self._data or now - self._data[c][0] > self.ttl - fresh_for]
+        tasks = []
+        for i, cell in enumerate(stale):
+            if i and per_second > 0:
+                await asyncio.sleep(1 / per_second)
+            tasks.append(self._inflight.start(cell, functools.partial(self._load, cell, prefetch=True)))
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        return len(cells), sum(1 for r in results if not isinstance(r, BaseException))
+
+    async def _load(self, cell, prefetch=False):
+        key = f"{cell[0]}:{cell[1]}"
+        if self.sqlite:
+            try:
+                row = await db.aio.lookup_weather(key, time.time() - self.ttl)
+            except Exception as e:
+                logger.error(f"Weather cache lookup failed: {e}")
+                row = None
+            if row is not None:
+                data, fetched_at = row
+                if not prefetch:
+                    self.sqlite_hits += 1
+                self._put(cell, fetched_at, data)
+                return data
+
+        failed_at = self._failed.get(cell)
+        if failed_at is not None and time.time() - failed_at < self.negative_ttl:
+            self.negative_hits += 1
+            raise WeatherUnavailable("fetch for this area failed moments ago")
+        if not self.breaker.allow():
+            raise WeatherUnavailable("weather API circuit is open")
+
+        if prefetch:
+            self.prefetched += 1
+        else:
+            self.misses += 1
+        try:
+            data = await self._fetch(*self._centre(cell))
+        except Exception:
+            self.errors += 1
+            self.breaker.record_failure()
+            self._remember_failure(cell)
+            raise
+        self.breaker.record_success()
+        self._failed.pop(cell, None)
+        fetched_at = time.time()
+        self._put(cell, fetched_at, data)
+        if self.sqlite:
+            try:
+                await db.aio.store_weather(key, data, fetched_at, fetched_at - self.ttl)
+            except Exception as e:
+                logger.error(f"Saving weather to cache failed: {e}")
+        return data
+
+    def _remember_failure(self, cell):
+        now = time.time()
+        self._failed[cell] = now
+        if len(self._failed) > self.maxsize:
+            self._failed = {c: t for c, t in self._failed.items() if now - t < self.negative_ttl}
+
+    def _put(self, cell, fetched_at, data):
+        self._data[cell] = (fetched_at, data)
+        self._data.move_to_end(cell)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def stats(self):
+        total = self.memory_hits + self.sqlite_hits + self.misses
+        return {
+            "cells": len(self._data),
+            "memory_hits": self.memory_hits,
+            "sqlite_hits": self.sqlite_hits,
+            "misses": self.misses,
+            "prefetched": self.prefetched,
+            "errors": self.errors,
+            "negative_hits": self.negative_hits,
+            "hit_rate": round((self.memory_hits + self.sqlite_hits) / total, 3) if total else 0,
+            "breaker": self.breaker.stats(),
+        }
+
+weather_cache = WeatherCache()
@@ -0,0 +1,66 @@
+import os
+import logging
+from datetime import datetime
+
+import database as db
+from utils.poller import QueuePoller
+from utils.weather.cache import weather_cache
+from utils.weather.breaker import WeatherUnavailable
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+POLL_SECONDS = float(os.getenv("WEATHER_POLL_SECONDS", "5"))        # Fallback check for due retries
+MAX_IN_FLIGHT = int(os.getenv("WEATHER_MAX_IN_FLIGHT", "8"))        # Entries being enriched at once
+MAX_LAG_SECONDS = float(os.getenv("WEATHER_MAX_LAG", "3600"))       # Older entries stay without weather rather than get a later reading
+
+# --- ENRICHER ---
+class WeatherEnricher(QueuePoller):
+    """
+    Fills in weather_json for entries saved with the pending marker, off the
+    farmer's path. Readings come through the grid cache, so a morning round of
+    spots costs one API call. Jobs are leased rather than marked running, so
+    one interrupted by a crash simply comes due again.
+    """
+    name = "weather-enrichment"
+
+    def __init__(self, poll=POLL_SECONDS, max_in_flight=MAX_IN_FLIGHT):
+        super().__init__(poll, max_in_flight, db.enrichment.MAX_ATTEMPTS, db.enrichment.RETRY_BASE_SECONDS)
+
+    async def start(self):
+        await super().start()
+        pending = await db.aio.pending_weather()
+        if pending:
+            logger.info(f"🌦 {pending} entries still waiting for weather from the last run.")
+
+    @staticmethod
+    def label(job):
+        return f"Weather for entry {job['log_id']}"
+
+    async def _claim(self, limit):
+        return await db.aio.claim_weather_jobs(limit)
+
+    async def _run(self, job):
+        lag = (datetime.now() - datetime.fromisoformat(job['created_at'])).total_seconds()
+        if lag > MAX_LAG_SECONDS:
+            logger.warning(f"Entry {job['log_id']} waited {lag / 60:.0f} min for weather, saving it without.")
+            await db.aio.give_up_weather(job['log_id'])
+            return
+        try:
+            data = await weather_cache.get(job['lat'], job['lon'])
+        except WeatherUnavailable as e:
+            # Refused without calling the API: the attempt doesn't count and there's no backoff,
+            # just a wait until the breaker or the failed-area entry can let a call through again
+            delay = max(weather_cache.breaker.cooldown, weather_cache.negative_ttl)
+            await db.aio.defer_weather(job['log_id'], str(e), delay)
+            return
+        except Exception as e:
+            await self._retry_or_give_up(job, e)
+            return
+        await db.aio.fill_weather(job['log_id'], data)
+
+    async def _retry(self, job, error, delay):
+        await db.aio.retry_weather(job['log_id'], str(error), delay)
+
+    async def _give_up(self, job, error):
+        await db.aio.give_up_weather(job['log_id'])
@@ -0,0 +1,89 @@
+import os
+import httpx
+import logging
+import asyncio
+from dotenv import load_dotenv
+
+load_dotenv()
+API_KEY = os.getenv("AGRO_API_KEY")
+BASE_URL = "https://api.agromonitoring.com/agro/1.0/weather"
+
+# --- CONFIGURATION ---
+WEATHER_TIMEOUT = float(os.getenv("WEATHER_TIMEOUT", "5"))                  # Seconds per request
+WEATHER_MAX_CONNECTIONS = int(os.getenv("WEATHER_MAX_CONNECTIONS", "10"))   # Pooled keep-alive connections to the API
+
+logger = logging.getLogger(__name__)
+
+# --- GLOBAL STATE ---
+_client = None
+
+def k_to_c(kelvin):
+    return round(kelvin - 273.15, 2)
+
+# --- SESSION ---
+async def open_session():
+    """Shared client, so requests reuse pooled keep-alive connections instead of a new TLS handshake each."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=WEATHER_TIMEOUT,
+            limits=httpx.Limits(max_connections=WEATHER_MAX_CONNECTIONS, max_keepalive_connections=WEATHER_MAX_CONNECTIONS),
+        )
+    return _client
+
+async def close_session():
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.aclose()
+
+# --- FETCH ---
+async def fetch_weather(lat, lon):
+    """Current conditions + next forecast point for one location. Raises on failure (the cache decides what to do)."""
+    # Opened lazily as well, for scripts that don't go through the bot's post_init
+    client = await open_session()
+    params = {"lat": lat, "lon": lon, "appid": API_KEY}
+    # Both calls in flight together: the wait is the slower of the two, not their sum
+    curr_res, fore_res = await asyncio.gather(
+        client.get(BASE_URL, params=params),
+        client.get(f"{BASE_URL}/forecast", params=params),
+        return_exceptions=True,
+    )
+    if isinstance(curr_res, BaseException):
+        raise curr_res
+    curr_res.raise_for_status()
+    c = curr_res.json()
+
+    # The forecast is optional: the entry is still saved with current conditions
+    if isinstance(fore_res, BaseException):
+        logger.warning(f"Weather forecast fetch failed: {fore_res}")
+        f_list = []
+    elif fore_res.status_code == 200:
+        f_list = fore_res.json()
+    else:
+        f_list = []
+
+    return parse_weather(c, f_list)
+
+def parse_weather(c, f_list):
+    # Extracting data
+    data = {
+        "temp": k_to_c(c['main']['temp']),
+        "temp_min": k_to_c(c['main']['temp_min']),
+        "temp_max": k_to_c(c['main']['temp_max']),
+        "pressure": c['main']['pressure'],
+        "humidity": c['main']['humidity'],
+        "wind_speed": c['wind'].get('speed', 0),
+        "wind_deg": c['wind'].get('deg', 0),
+        "desc": c['weather'][0]['description'],
+        "forecast_temp": k_to_c(f_list[0]['main']['temp']) if f_list else None
+    }
+    
+    # String for AI Prompt
+    data['display_str'] = (
+        f"Current: {data['temp']}°C ({data['desc'].capitalize()}). "
+        f"Humidity: {data['humidity']}%, Wind: {data['wind_speed']}m/s at {data['wind_deg']}°. "
+        f"Next forecast: {data['forecast_temp']}°C."
+    )
+    
+    return data